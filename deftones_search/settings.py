@@ -67,6 +67,14 @@ DATABASES = {
     }
 }
 
+# Queue scrapes from the web form for `manage.py scrape_worker` instead of
+# running them in the web process
+SCRAPE_USE_WORKERS = os.environ.get("SCRAPE_USE_WORKERS", "") == "1"
+
+# Bearer token for POST /api/scrape/ and /api/scrape/stream/ (non-browser
+# clients, so no CSRF token). Without one they are only open in DEBUG.
+SCRAPE_API_TOKEN = os.environ.get("SCRAPE_API_TOKEN", "")
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
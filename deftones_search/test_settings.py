@@ -0,0 +1,13 @@
+"""
+Settings for the test suite: a throwaway SQLite database instead of the
+shared Postgres
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "test_db.sqlite3",
+    }
+}
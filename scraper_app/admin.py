@@ -1,10 +1,10 @@
 from django.contrib import admin
-from .models import Playlist, Video
+from .models import Playlist, ScrapeTask, Video
 
 
 @admin.register(Playlist)
 class PlaylistAdmin(admin.ModelAdmin):
-    list_display = ['title', 'video_count', 'created_at']
+    list_display = ['title', 'video_count', 'partial', 'created_at']
     search_fields = ['title', 'playlist_id']
     list_filter = ['created_at']
     readonly_fields = ['created_at']
@@ -16,3 +16,11 @@ class VideoAdmin(admin.ModelAdmin):
     search_fields = ['title', 'video_id']
     list_filter = ['playlist', 'created_at']
     readonly_fields = ['created_at']
+
+
+@admin.register(ScrapeTask)
+class ScrapeTaskAdmin(admin.ModelAdmin):
+    list_display = ['query', 'status', 'attempts', 'lease_owner', 'lease_expires_at', 'created_at']
+    search_fields = ['query', 'lease_owner']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['created_at', 'updated_at', 'heartbeat_at']
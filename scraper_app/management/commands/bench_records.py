@@ -0,0 +1,94 @@
+"""
+Management command to compare the memory of dict vs slotted catalogue entries
+"""
+import json
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from scraper_app.services.records import CatalogueEntry
+
+
+class Command(BaseCommand):
+    help = 'Benchmark memory and load time of the video catalogue as plain dicts vs CatalogueEntry'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--playlists', type=int, default=500)
+        parser.add_argument('--videos', type=int, default=50, help='Videos per playlist')
+        parser.add_argument('--distinct-videos', type=int, default=5000,
+                            help='Size of the pool videos are drawn from (smaller = more overlap)')
+        parser.add_argument('--real', action='store_true', help='Use the stored catalogue instead of synthetic data')
+
+    def handle(self, *args, **options):
+        if options['real']:
+            from scraper_app.services import storage
+
+            lines = [storage._catalogue_line(e) for e in storage._load_catalogue().values()]
+        else:
+            lines = self.synthetic_catalogue(options)
+
+        size = sum(len(line) for line in lines)
+        self.stdout.write(f'{len(lines)} videos, {size / 1e6:.1f} MB NDJSON')
+
+        dict_mem, dict_time = self.measure(lambda: self.load_dicts(lines))
+        rec_mem, rec_time = self.measure(lambda: self.load_entries(lines))
+
+        entries = self.load_entries(lines)
+        start = time.perf_counter()
+        for entry in entries.values():
+            json.dumps(entry.to_dict())
+        dump_time = time.perf_counter() - start
+
+        self.stdout.write(f'  dicts:   {dict_mem / 1e6:8.1f} MB  load {dict_time * 1000:7.0f} ms')
+        self.stdout.write(f'  entries: {rec_mem / 1e6:8.1f} MB  load {rec_time * 1000:7.0f} ms'
+                          f'  dump {dump_time * 1000:7.0f} ms')
+        if dict_mem:
+            self.stdout.write(self.style.SUCCESS(f'Entries use {100 * (1 - rec_mem / dict_mem):.0f}% less memory'))
+
+    def load_dicts(self, lines):
+        index = {}
+        for line in lines:
+            entry = json.loads(line)
+            index[entry.pop('video_id')] = entry
+        return index
+
+    def load_entries(self, lines):
+        """The catalogue as storage keeps it in memory"""
+        index = {}
+        for line in lines:
+            entry = json.loads(line)
+            index[entry['video_id']] = CatalogueEntry.from_dict(entry['video_id'], entry)
+        return index
+
+    def measure(self, build):
+        """(retained bytes, seconds) of the object returned by ``build``"""
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - start
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        return retained, elapsed
+
+    def synthetic_catalogue(self, options):
+        """Catalogue lines for playlists drawing from a shared pool of videos,
+        like real search results"""
+        rng = random.Random(0)
+        pool = [
+            (f'v{i:010d}', f'Artist {i % 300} - Song title number {i}')
+            for i in range(options['distinct_videos'])
+        ]
+        catalogue = {}
+        for p in range(options['playlists']):
+            playlist_id = f'PL{p:032d}'
+            for video_id, title in rng.sample(pool, min(options['videos'], len(pool))):
+                entry = catalogue.setdefault(video_id, {
+                    'video_id': video_id,
+                    'title': title,
+                    'thumbnail': f'https://img.youtube.com/vi/{video_id}/hqdefault.jpg',
+                    'playlists': [],
+                })
+                entry['playlists'].append(playlist_id)
+        return [json.dumps(entry) + '\n' for entry in catalogue.values()]
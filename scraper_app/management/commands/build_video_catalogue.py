@@ -0,0 +1,35 @@
+"""
+Management command to move per-playlist video copies into the global catalogue
+"""
+import os
+
+from django.core.management.base import BaseCommand
+from scraper_app.services import storage
+
+
+class Command(BaseCommand):
+    help = 'Convert video files saved by older versions into the video catalogue'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write('Building video catalogue...')
+        os.makedirs(storage.VIDEOS_DIR, exist_ok=True)
+
+        imported = storage.import_legacy_catalogue()
+        if imported:
+            self.stdout.write(f'  Imported {imported} videos from older catalogue files')
+
+        converted = 0
+        for name in sorted(os.listdir(storage.VIDEOS_DIR)):
+            path = os.path.join(storage.VIDEOS_DIR, name)
+            if not name.endswith('.json') or not os.path.isfile(path):
+                continue
+
+            playlist_id = name[:-len('.json')]
+            videos = storage.get_playlist_videos(playlist_id) or []
+            # Rewrites legacy full copies as references and (re)indexes the
+            # memberships of listed playlists
+            storage.save_playlist_videos(playlist_id, videos)
+            converted += 1
+            self.stdout.write(f'  {playlist_id}: {len(videos)} videos')
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {converted} playlists'))
@@ -3,33 +3,36 @@ Management command to clean up duplicate videos from database
 """
 from django.core.management.base import BaseCommand
 from scraper_app.models import Video
-from django.db.models import Min
+from django.db.models import Count, Min
 
 
 class Command(BaseCommand):
-    help = 'Remove duplicate videos from the database'
+    help = 'Remove videos listed more than once in the same playlist'
 
     def handle(self, *args, **kwargs):
         self.stdout.write('Finding duplicate videos...')
         
-        # Find duplicates by video_id
-        duplicates = Video.objects.values('video_id').annotate(
-            min_id=Min('id')
-        ).filter(id__in=Video.objects.values('id'))
+        # A video may belong to many playlists; only repeats within one
+        # playlist are duplicates (databases created before the
+        # (playlist, video_id) unique constraint can still have them)
+        duplicates = Video.objects.values('playlist_id', 'video_id').annotate(
+            min_id=Min('id'), count=Count('id')
+        ).filter(count__gt=1)
         
         deleted_count = 0
         
         for dup in duplicates:
-            video_id = dup['video_id']
-            min_id = dup['min_id']
-            
-            # Delete all except the one with minimum ID
-            videos_to_delete = Video.objects.filter(video_id=video_id).exclude(id=min_id)
-            count = videos_to_delete.count()
+            # Keep the first row of the video in that playlist
+            videos_to_delete = Video.objects.filter(
+                playlist_id=dup['playlist_id'], video_id=dup['video_id']
+            ).exclude(id=dup['min_id'])
+            count, _ = videos_to_delete.delete()
             
             if count > 0:
-                videos_to_delete.delete()
                 deleted_count += count
-                self.stdout.write(f'  Removed {count} duplicates for video_id: {video_id}')
+                self.stdout.write(
+                    f'  Removed {count} duplicates for video_id: {dup["video_id"]} '
+                    f'in playlist {dup["playlist_id"]}'
+                )
         
         self.stdout.write(self.style.SUCCESS(f'Successfully removed {deleted_count} duplicate videos'))
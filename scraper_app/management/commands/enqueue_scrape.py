@@ -0,0 +1,20 @@
+"""
+Management command to queue scrapes for the scrape workers
+"""
+from django.core.management.base import BaseCommand
+from scraper_app.services.tasks import enqueue_scrape
+
+
+class Command(BaseCommand):
+    help = 'Queue one scrape task per search query'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='+')
+        parser.add_argument('--max-playlists', type=int, default=12)
+
+    def handle(self, *args, **options):
+        for query in options['queries']:
+            task = enqueue_scrape(query, options['max_playlists'])
+            self.stdout.write(f'  Queued task {task.pk}: {query}')
+
+        self.stdout.write(self.style.SUCCESS(f"Queued {len(options['queries'])} tasks"))
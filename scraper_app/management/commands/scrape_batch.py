@@ -0,0 +1,81 @@
+"""
+Management command to scrape a file of search queries in one batch
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Scrape every query in a file (one per line), sharing browsers and skipping duplicate playlists'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries_file', help="One query per line; blank lines and '#' comments are ignored")
+        parser.add_argument('--max-playlists', type=int, default=12)
+        parser.add_argument('--browsers', type=int, default=1, help='Number of browsers scraping in parallel')
+        parser.add_argument('--db', action='store_true', help='Save to the Playlist/Video models instead of the JSON files')
+        parser.add_argument('--skip-existing', action='store_true', help='Skip playlists that are already stored')
+        parser.add_argument('--report', help='Write a JSON summary report to this file')
+
+    def handle(self, *args, **options):
+        from scraper_app.services.batch import BatchScrape
+
+        if options['browsers'] < 1:
+            raise CommandError('--browsers must be at least 1')
+        queries = self.read_queries(options['queries_file'])
+        if not queries:
+            raise CommandError('No queries found in %s' % options['queries_file'])
+
+        if options['db']:
+            from scraper_app.models import Playlist
+            from scraper_app.services.tasks import save_playlist_to_db
+
+            persist = save_playlist_to_db
+            existing = Playlist.objects.values_list('playlist_id', flat=True)
+        else:
+            from scraper_app.services.storage import get_playlists, save_scraped_playlist
+
+            persist = save_scraped_playlist
+            existing = [p.get('playlist_id') for p in get_playlists()]
+
+        self.stdout.write(f'Scraping {len(queries)} queries with {options["browsers"]} browser(s)...')
+        batch = BatchScrape(
+            max_playlists=options['max_playlists'],
+            browsers=options['browsers'],
+            persist=persist,
+            progress=self.show_progress,
+            skip_ids=existing if options['skip_existing'] else (),
+        )
+        report = batch.run(queries)
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f'Report written to {options["report"]}')
+
+        totals = report['totals']
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {report["elapsed_seconds"]}s: {totals["scraped"]} playlists scraped, '
+            f'{totals["duplicates"]} duplicates skipped, {totals["partial"]} partial, '
+            f'{totals["failed"]} failed, {totals["failed_queries"]} failed queries'
+        ))
+
+    def read_queries(self, path):
+        """Unique, non-empty queries from the file, in order"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = [line.strip() for line in f]
+        except OSError as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+        return list(dict.fromkeys(line for line in lines if line and not line.startswith('#')))
+
+    def show_progress(self, done, total, stats):
+        line = (
+            f'  [{done}/{total}] {stats["query"]}: {stats["discovered"]} found, '
+            f'{stats["scraped"]} scraped, {stats["duplicates"]} duplicates, {stats["partial"]} partial, '
+            f'{stats["failed"]} failed'
+        )
+        if stats['error']:
+            self.stdout.write(self.style.ERROR(f'{line} - error: {stats["error"]}'))
+        else:
+            self.stdout.write(line)
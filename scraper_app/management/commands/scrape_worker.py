@@ -0,0 +1,26 @@
+"""
+Management command to run a scrape worker that claims queued ScrapeTasks
+"""
+from django.core.management.base import BaseCommand
+from scraper_app.services.tasks import DEFAULT_LEASE_SECONDS, run_worker
+
+
+class Command(BaseCommand):
+    help = 'Claim queued scrape tasks from the database and run them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--worker-id', help='Lease owner name (default: host:pid)')
+        parser.add_argument('--lease', type=int, default=DEFAULT_LEASE_SECONDS, help='Lease length in seconds')
+        parser.add_argument('--poll', type=float, default=5.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--max-tasks', type=int, help='Exit after this many tasks')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        done = run_worker(
+            worker_id=options['worker_id'],
+            lease_seconds=options['lease'],
+            poll_interval=options['poll'],
+            max_tasks=options['max_tasks'],
+            burst=options['burst'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Worker finished after {done} tasks'))
@@ -7,7 +7,8 @@ class Playlist(models.Model):
     title = models.CharField(max_length=200)
     url = models.URLField()
     video_count = models.CharField(max_length=50, default="N/A")
-    thumbnail = models.URLField(blank=True, null=True)
+    thumbnail = models.URLField(max_length=500, blank=True, null=True)
+    partial = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -35,6 +36,7 @@ class Video(models.Model):
     
     class Meta:
         ordering = ['position']
+        unique_together = [('playlist', 'video_id')]
     
     def __str__(self):
         return self.title
@@ -58,3 +60,36 @@ class Video(models.Model):
     def get_youtube_url(self):
         """Get direct YouTube watch URL"""
         return f"https://www.youtube.com/watch?v={self.video_id}"
+
+
+class ScrapeTask(models.Model):
+    """Queued scrape, claimed by workers through a database lease"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    query = models.CharField(max_length=200)
+    max_playlists = models.IntegerField(default=12)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    lease_owner = models.CharField(max_length=100, blank=True)
+    lease_expires_at = models.DateTimeField(blank=True, null=True, db_index=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"{self.query} ({self.status})"
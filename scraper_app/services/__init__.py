@@ -1,13 +1,25 @@
-from .scraper import (
-    search_and_scrape_playlists,
-    get_playlist_by_id,
-    get_video_by_id,
-    load_from_json,
-)
-
-__all__ = [
-    "search_and_scrape_playlists",
-    "get_playlist_by_id",
-    "get_video_by_id",
-    "load_from_json",
-]
+"""
+Scraper services
+
+The scraping stack (Selenium, bs4) is heavy, so nothing is imported here
+eagerly: names resolve on first access, from ``storage`` where possible.
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    "search_and_scrape_playlists": ".scraper",
+    "get_playlist_by_id": ".storage",
+    "get_video_by_id": ".storage",
+    "load_from_json": ".storage",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,288 @@
+"""
+Asyncio YouTube scraper - fetches pages over plain HTTP concurrently
+
+Instead of driving a browser, pages are fetched with httpx and the
+``ytInitialData`` JSON that YouTube embeds in every page is parsed directly.
+Results are saved through the same JSON functions as the Selenium scraper.
+"""
+
+import asyncio
+import json
+import re
+import time
+from datetime import datetime
+
+import httpx
+
+from .resilience import ScrapeError, call_with_retry_async, check_blocked
+from .storage import save_playlists, save_scraped_videos
+
+
+SEARCH_URL = "https://www.youtube.com/results"
+PLAYLIST_URL = "https://www.youtube.com/playlist"
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+# Skip the EU cookie consent interstitial
+COOKIES = {"CONSENT": "YES+1"}
+
+INITIAL_DATA_RE = re.compile(r"var ytInitialData\s*=\s*(\{.*?\});\s*</script>", re.S)
+
+
+class AsyncRateLimiter:
+    """Space requests at least ``interval`` seconds apart across all tasks"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class AsyncScrapeEngine:
+    """Shared HTTP client, concurrency cap and rate limit for async scrapes
+
+    Use as ``async with AsyncScrapeEngine() as engine:`` so the connection
+    pool is closed afterwards.
+    """
+
+    def __init__(self, concurrency=8, interval=0.2, timeout=20.0):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = AsyncRateLimiter(interval)
+        self.client = httpx.AsyncClient(
+            headers=HEADERS,
+            cookies=COOKIES,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=concurrency),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+
+    async def fetch(self, url, params=None):
+        """GET a page with retries, respecting the concurrency cap and rate limit
+
+        Raises ScrapeError once retries are exhausted or the circuit is open.
+        """
+        return await call_with_retry_async(self._fetch_once, url, params)
+
+    async def _fetch_once(self, url, params):
+        async with self.semaphore:
+            await self.limiter.wait()
+            response = await self.client.get(url, params=params)
+            response.raise_for_status()
+            check_blocked(response.text, str(response.url))
+            return response.text
+
+    async def scrape_playlists(self, query, max_playlists=15):
+        """Scrape playlist search results"""
+        html = await self.fetch(SEARCH_URL, {"search_query": f"{query} playlist"})
+        return parse_search_results(extract_initial_data(html), max_playlists)
+
+    async def scrape_playlist_videos(self, playlist_id, max_videos=50):
+        """Scrape the videos of one playlist"""
+        html = await self.fetch(PLAYLIST_URL, {"list": playlist_id})
+        return parse_playlist_videos(extract_initial_data(html), max_videos)
+
+    async def scrape_playlist(self, index, playlist):
+        """Copy of ``playlist`` with its ``videos``, or marked partial"""
+        playlist = dict(playlist)
+        try:
+            videos = await self.scrape_playlist_videos(playlist["playlist_id"])
+        except ScrapeError as e:
+            print(f"Error: {playlist['playlist_id']}: {e}")
+            playlist["partial"] = True
+            playlist["error"] = str(e)
+            playlist["videos"] = None
+            return playlist
+
+        playlist["videos"] = videos
+        playlist["video_count"] = len(videos)
+        if videos:
+            if videos[0].get("thumbnail"):
+                playlist["thumbnail"] = videos[0]["thumbnail"]
+            if not playlist.get("title") or playlist["title"] == "Untitled Playlist":
+                playlist["title"] = f"Playlist {index + 1}"
+        return playlist
+
+    async def search_and_scrape_playlists(self, query, max_playlists=12):
+        """Scrape playlists, then all of their videos concurrently
+
+        Each playlist is saved as soon as its videos are in, and listed in
+        search order.
+        """
+        print(f"\n=== Scraping (async): {query} ===")
+
+        try:
+            playlists = await self.scrape_playlists(query, max_playlists)
+        except ScrapeError as e:
+            print(f"Error: {e}")
+            return None
+
+        if not playlists:
+            print("No playlists found")
+            return None
+
+        # Results of a new search replace the previous ones
+        await asyncio.to_thread(save_playlists, [])
+
+        async def scrape_indexed(index, playlist):
+            return index, await self.scrape_playlist(index, playlist)
+
+        # Playlists complete in any order; the listing keeps search order
+        entries = [None] * len(playlists)
+        partial = 0
+        pending = [scrape_indexed(i, p) for i, p in enumerate(playlists)]
+        for next_done in asyncio.as_completed(pending):
+            index, playlist = await next_done
+            entries[index] = await asyncio.to_thread(save_scraped_videos, playlist)
+            if entries[index].get("partial"):
+                partial += 1
+            listing = [entry for entry in entries if entry is not None]
+            await asyncio.to_thread(save_playlists, listing)
+
+        print(f"\n✅ Done! {len(playlists)} playlists saved ({partial} partial)")
+        return {
+            "search_query": query,
+            "scraped_at": datetime.now().isoformat(),
+            "total_playlists": len(playlists),
+            "partial_playlists": partial,
+        }
+
+
+async def search_and_scrape_playlists_async(query, max_playlists=12, **engine_options):
+    """Async counterpart of ``search_and_scrape_playlists``"""
+    async with AsyncScrapeEngine(**engine_options) as engine:
+        return await engine.search_and_scrape_playlists(query, max_playlists)
+
+
+# Parsing
+def extract_initial_data(html):
+    """Pull the ytInitialData JSON blob out of a YouTube page"""
+    match = INITIAL_DATA_RE.search(html)
+    if not match:
+        return {}
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return {}
+
+
+def iter_renderers(data, *keys):
+    """Yield (key, object) for every nested object stored under ``keys``"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key in keys:
+                if key in node:
+                    yield key, node[key]
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def get_text(field):
+    """Read a YouTube text field ({simpleText} or {runs: [...]})"""
+    if not field:
+        return ""
+    if "simpleText" in field:
+        return field["simpleText"]
+    return "".join(run.get("text", "") for run in field.get("runs", []))
+
+
+def parse_search_results(data, max_playlists):
+    """Playlists from a search results page, same shape as the Selenium scraper"""
+    playlists = []
+    seen_ids = set()
+
+    for key, renderer in iter_renderers(data, "playlistRenderer", "lockupViewModel"):
+        if len(playlists) >= max_playlists:
+            break
+
+        if key == "lockupViewModel":
+            if renderer.get("contentType") != "LOCKUP_CONTENT_TYPE_PLAYLIST":
+                continue
+            playlist_id, title, thumb_url = _parse_lockup(renderer)
+        else:
+            playlist_id = renderer.get("playlistId")
+            title = get_text(renderer.get("title"))
+            thumbs = renderer.get("thumbnails") or [{}]
+            thumb_url = (thumbs[0].get("thumbnails") or [{}])[-1].get("url")
+
+        if not playlist_id or playlist_id in seen_ids:
+            continue
+        seen_ids.add(playlist_id)
+
+        thumbnail = thumb_url or f"https://img.youtube.com/vi/{playlist_id}/hqdefault.jpg"
+        title = title or "Untitled Playlist"
+        playlists.append(
+            {
+                "playlist_id": playlist_id,
+                "url": f"https://www.youtube.com/playlist?list={playlist_id}",
+                "title": title[:200],
+                "thumbnail": thumbnail,
+                "video_count": 0,
+            }
+        )
+
+    return playlists
+
+
+def _parse_lockup(lockup):
+    """(playlist_id, title, thumbnail) from the newer lockupViewModel layout"""
+    metadata = lockup.get("metadata", {}).get("lockupMetadataViewModel", {})
+    title = metadata.get("title", {}).get("content", "")
+    sources = (
+        lockup.get("contentImage", {})
+        .get("collectionThumbnailViewModel", {})
+        .get("primaryThumbnail", {})
+        .get("thumbnailViewModel", {})
+        .get("image", {})
+        .get("sources")
+        or [{}]
+    )
+    return lockup.get("contentId"), title, sources[-1].get("url")
+
+
+def parse_playlist_videos(data, max_videos):
+    """Videos from a playlist page, same shape as the Selenium scraper"""
+    videos = []
+
+    for _, renderer in iter_renderers(data, "playlistVideoRenderer"):
+        if len(videos) >= max_videos:
+            break
+
+        video_id = renderer.get("videoId")
+        if not video_id:
+            continue
+
+        thumbnail = f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
+        thumbs = (renderer.get("thumbnail") or {}).get("thumbnails") or []
+        if thumbs:
+            thumbnail = thumbs[-1].get("url", thumbnail)
+
+        videos.append(
+            {
+                "position": len(videos) + 1,
+                "video_id": video_id,
+                "title": get_text(renderer.get("title"))[:300],
+                "url": f"https://www.youtube.com/watch?v={video_id}",
+                "thumbnail": thumbnail,
+            }
+        )
+
+    return videos
@@ -0,0 +1,145 @@
+"""
+Batch scraping of many search queries
+
+Each thread keeps one browser open for all of its queries, and a playlist
+found by several queries is only scraped by the first one to claim it.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.db import connections
+
+from .scraper import DriverSession, scrape_playlist, scrape_playlists
+from .storage import save_scraped_playlist
+
+
+class BatchScrape:
+    """Scrape ``queries`` with ``browsers`` shared browser sessions
+
+    ``persist`` is called with each scraped playlist (see
+    ``scrape_playlist``); ``progress`` with (done, total, query_stats)
+    after every query. Playlist IDs in ``skip_ids`` are never scraped.
+    A failing query or playlist is recorded in its query's stats and the
+    batch carries on.
+    """
+
+    def __init__(
+        self,
+        max_playlists=12,
+        browsers=1,
+        persist=save_scraped_playlist,
+        progress=None,
+        skip_ids=(),
+    ):
+        self.max_playlists = max_playlists
+        self.browsers = browsers
+        self.persist = persist
+        self.progress = progress
+        self._claimed = set(skip_ids)
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions = []
+        self._done = 0
+
+    def _session(self):
+        """This thread's browser session"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = DriverSession()
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def _claim(self, playlist_id):
+        """True if no other query has taken this playlist yet"""
+        with self._lock:
+            if playlist_id in self._claimed:
+                return False
+            self._claimed.add(playlist_id)
+            return True
+
+    def scrape_query(self, query):
+        """Scrape one query's unclaimed playlists; returns its stats"""
+        stats = {
+            "query": query,
+            "discovered": 0,
+            "scraped": 0,
+            "duplicates": 0,
+            "partial": 0,
+            "failed": 0,
+            "error": None,
+        }
+
+        try:
+            session = self._session()
+            playlists = scrape_playlists(query, self.max_playlists, session=session)
+        except Exception as e:
+            stats["error"] = str(e)
+            return stats
+
+        stats["discovered"] = len(playlists)
+        for i, playlist in enumerate(playlists):
+            if not self._claim(playlist["playlist_id"]):
+                stats["duplicates"] += 1
+                continue
+
+            try:
+                scraped = scrape_playlist(playlist, i, session=session)
+                with self._persist_lock:
+                    self.persist(scraped)
+            except Exception as e:
+                print(f"Error: {playlist['playlist_id']}: {e}")
+                stats["failed"] += 1
+                stats["error"] = f"{playlist['playlist_id']}: {e}"
+                continue
+
+            stats["scraped"] += 1
+            if scraped.get("partial"):
+                stats["partial"] += 1
+            time.sleep(0.5)
+
+        return stats
+
+    def _run_query(self, query, total):
+        try:
+            stats = self.scrape_query(query)
+        finally:
+            # --db persists from pool threads, each with its own connection
+            connections.close_all()
+        with self._lock:
+            self._done += 1
+            done = self._done
+        if self.progress:
+            self.progress(done, total, stats)
+        return stats
+
+    def run(self, queries):
+        """Scrape every query and return a summary report"""
+        started = time.monotonic()
+        started_at = datetime.now().isoformat()
+        total = len(queries)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.browsers) as pool:
+                results = list(pool.map(lambda q: self._run_query(q, total), queries))
+        finally:
+            for session in self._sessions:
+                session.close()
+
+        totals = {
+            key: sum(r[key] for r in results)
+            for key in ("discovered", "scraped", "duplicates", "partial", "failed")
+        }
+        totals["failed_queries"] = sum(1 for r in results if r["error"])
+
+        return {
+            "started_at": started_at,
+            "finished_at": datetime.now().isoformat(),
+            "elapsed_seconds": round(time.monotonic() - started, 1),
+            "totals": totals,
+            "queries": results,
+        }
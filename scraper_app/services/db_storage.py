@@ -0,0 +1,175 @@
+"""
+Database storage for scraped playlists and videos
+
+Read-side counterpart of ``storage`` for the Playlist / Video models that
+scrape workers write into (see ``tasks``). Same functions and record
+shapes, so views can read from either. Playlists are listed newest first.
+"""
+
+from django.db.models import Q
+
+from ..models import Playlist, Video
+
+
+PLAYLIST_ORDER = ("-created_at", "-pk")
+VIDEO_ORDER = ("-playlist__created_at", "-playlist__pk", "position", "pk")
+ITER_CHUNK_SIZE = 500
+
+
+def _playlist_dict(obj):
+    playlist = {
+        "playlist_id": obj.playlist_id,
+        "url": obj.url,
+        "title": obj.title,
+        "thumbnail": obj.thumbnail
+        or f"https://img.youtube.com/vi/{obj.playlist_id}/hqdefault.jpg",
+        "video_count": int(obj.video_count) if obj.video_count.isdigit() else 0,
+    }
+    if obj.partial:
+        playlist["partial"] = True
+        playlist["error"] = None
+    return playlist
+
+
+def _video_dict(obj):
+    return {
+        "position": obj.position,
+        "video_id": obj.video_id,
+        "title": obj.title,
+        "url": obj.get_youtube_url(),
+        "thumbnail": obj.get_thumbnail(),
+    }
+
+
+def _get_playlist(playlist_id):
+    """Playlist row by ID; KeyError if it doesn't exist"""
+    try:
+        return Playlist.objects.get(playlist_id=playlist_id)
+    except Playlist.DoesNotExist:
+        raise KeyError(playlist_id) from None
+
+
+def _listed_after(playlist, prefix=""):
+    """Filter for playlists after ``playlist`` in the listing"""
+    return Q(**{f"{prefix}created_at__lt": playlist.created_at}) | Q(
+        **{f"{prefix}created_at": playlist.created_at, f"{prefix}pk__lt": playlist.pk}
+    )
+
+
+def _containing(video_ids):
+    """{video_id: [playlist_id, ...]} in listing order"""
+    containing = {}
+    rows = (
+        Video.objects.filter(video_id__in=video_ids)
+        .order_by(*VIDEO_ORDER)
+        .values_list("video_id", "playlist__playlist_id")
+    )
+    for video_id, playlist_id in rows:
+        containing.setdefault(video_id, []).append(playlist_id)
+    return containing
+
+
+def get_playlists():
+    """All playlists"""
+    return [_playlist_dict(p) for p in Playlist.objects.order_by(*PLAYLIST_ORDER)]
+
+
+def get_playlist_by_id(playlist_id):
+    """Get playlist by ID with videos"""
+    try:
+        obj = Playlist.objects.get(playlist_id=playlist_id)
+    except Playlist.DoesNotExist:
+        return None
+    playlist = _playlist_dict(obj)
+    videos = [_video_dict(v) for v in obj.videos.order_by("position", "pk")]
+    if videos:
+        playlist["videos"] = videos
+    return playlist
+
+
+def get_playlists_by_ids(playlist_ids):
+    """Batch lookup: playlists keyed by ID, in one query"""
+    return {
+        p.playlist_id: _playlist_dict(p)
+        for p in Playlist.objects.filter(playlist_id__in=list(playlist_ids))
+    }
+
+
+def get_videos_by_ids(video_ids):
+    """Batch lookup: videos keyed by ID, each tagged with the first listed
+    playlist containing it and ``playlist_ids``, all listed ones that do"""
+    video_ids = list(dict.fromkeys(video_ids))
+    containing = _containing(video_ids)
+    found = {}
+    rows = (
+        Video.objects.filter(video_id__in=video_ids)
+        .select_related("playlist")
+        .order_by(*VIDEO_ORDER)
+    )
+    for obj in rows:
+        if obj.video_id in found:
+            continue
+        video = _video_dict(obj)
+        video["playlist_id"] = obj.playlist.playlist_id
+        video["playlist_ids"] = containing[obj.video_id]
+        found[obj.video_id] = video
+    return found
+
+
+def get_video_by_id(video_id):
+    """Find video by ID, with the first listed playlist containing it"""
+    found = get_videos_by_ids([video_id]).get(video_id)
+    if not found:
+        return None, None
+    playlist = get_playlists_by_ids([found["playlist_id"]])[found["playlist_id"]]
+    return found, playlist
+
+
+def iter_playlists(after=None):
+    """Iterate the listed playlists, starting after the playlist ID ``after``
+
+    Raises KeyError if ``after`` doesn't exist.
+    """
+    playlists = Playlist.objects.order_by(*PLAYLIST_ORDER)
+    if after is not None:
+        playlists = playlists.filter(_listed_after(_get_playlist(after)))
+    return (_playlist_dict(p) for p in playlists.iterator(chunk_size=ITER_CHUNK_SIZE))
+
+
+def iter_videos(playlist_ids=None, after=None):
+    """Iterate every stored video tagged with the playlist it belongs to
+
+    Same order, tags and ``after`` = (playlist_id, position) keyset as
+    ``storage.iter_videos``; raises KeyError if that playlist doesn't exist.
+    """
+    videos = Video.objects.select_related("playlist").order_by(*VIDEO_ORDER)
+    if playlist_ids is not None:
+        videos = videos.filter(playlist__playlist_id__in=list(playlist_ids))
+    if after is not None:
+        after_id, after_position = after
+        playlist = _get_playlist(after_id)
+        videos = videos.filter(
+            _listed_after(playlist, "playlist__")
+            | Q(playlist=playlist, position__gt=int(after_position))
+        )
+    return _iter_videos(videos)
+
+
+def _iter_videos(videos):
+    chunk = []
+    for obj in videos.iterator(chunk_size=ITER_CHUNK_SIZE):
+        chunk.append(obj)
+        if len(chunk) == ITER_CHUNK_SIZE:
+            yield from _tag_videos(chunk)
+            chunk = []
+    yield from _tag_videos(chunk)
+
+
+def _tag_videos(objs):
+    containing = _containing({obj.video_id for obj in objs})
+    for obj in objs:
+        yield dict(
+            _video_dict(obj),
+            playlist_id=obj.playlist.playlist_id,
+            playlist_ids=containing[obj.video_id],
+        )
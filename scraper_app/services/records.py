@@ -0,0 +1,62 @@
+"""
+Compact in-memory records for the video catalogue
+
+Plain dicts repeat every key per object and keep full URLs that can be
+derived from the ID. These ``__slots__`` classes store only what can't be
+derived, intern IDs and titles (the same video shows up in many playlists),
+and convert to and from the JSON storage format.
+"""
+
+import sys
+
+
+def _intern(value):
+    return sys.intern(value) if value else value
+
+
+class CatalogueEntry:
+    """A video in the global catalogue, with the playlists containing it"""
+
+    __slots__ = ("video_id", "title", "_thumbnail", "playlists")
+
+    def __init__(self, video_id, title="", thumbnail=None, playlists=()):
+        self.video_id = _intern(video_id)
+        self.title = _intern(title)
+        self._thumbnail = None if thumbnail == self.default_thumbnail else thumbnail
+        self.playlists = tuple(_intern(p) for p in playlists)
+
+    def __repr__(self):
+        return f"CatalogueEntry({self.video_id!r}, {self.title!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, CatalogueEntry):
+            return NotImplemented
+        return self.video_id == other.video_id and self.to_dict() == other.to_dict()
+
+    @property
+    def default_thumbnail(self):
+        return f"https://img.youtube.com/vi/{self.video_id}/hqdefault.jpg"
+
+    @property
+    def thumbnail(self):
+        if self._thumbnail is None:
+            return self.default_thumbnail
+        return self._thumbnail
+
+    @classmethod
+    def from_dict(cls, video_id, data):
+        """Build from a catalogue line (or an older video_catalogue.json entry)"""
+        return cls(
+            video_id,
+            data.get("title", ""),
+            data.get("thumbnail"),
+            data.get("playlists", ()),
+        )
+
+    def to_dict(self):
+        """The catalogue format, without ``video_id``"""
+        return {
+            "title": self.title,
+            "thumbnail": self._thumbnail,
+            "playlists": list(self.playlists),
+        }
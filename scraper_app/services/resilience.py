@@ -0,0 +1,236 @@
+"""
+Retry, backoff and circuit breaking for scrape fetches
+
+Failures are classified into ScrapeError subclasses: transient and blocked
+errors are retried with jittered exponential backoff, permanent ones are not.
+A per-host circuit breaker opens after repeated failures so that, while
+YouTube is blocking us, fetches fail fast instead of burning browser cycles.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+
+YOUTUBE_HOST = "www.youtube.com"
+
+# Markers of YouTube / Google anti-bot and consent interstitials
+BLOCKED_MARKERS = (
+    "our systems have detected unusual traffic",
+    "google.com/sorry",
+    "consent.youtube.com",
+)
+
+
+class ScrapeError(Exception):
+    """Base class for classified scrape failures"""
+
+    retryable = False
+
+
+class TransientScrapeError(ScrapeError):
+    """Timeouts, dropped connections, 5xx - worth retrying"""
+
+    retryable = True
+
+
+class BlockedError(ScrapeError):
+    """YouTube is throttling or challenging us (429, captcha, consent wall)"""
+
+    retryable = True
+
+
+class PermanentScrapeError(ScrapeError):
+    """Will fail the same way again (404, unparseable page)"""
+
+
+class CircuitOpenError(ScrapeError):
+    """The host's circuit breaker is open - not attempted"""
+
+
+class DriverError(PermanentScrapeError):
+    """The local browser couldn't be started - says nothing about the host"""
+
+
+def classify_error(exc):
+    """Map any exception raised while fetching to a ScrapeError"""
+    if isinstance(exc, ScrapeError):
+        return exc
+
+    # httpx.HTTPStatusError and similar carry the response
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is not None:
+        if status in (403, 429):
+            return BlockedError(f"HTTP {status}")
+        if status >= 500:
+            return TransientScrapeError(f"HTTP {status}")
+        return PermanentScrapeError(f"HTTP {status}")
+
+    # Selenium and httpx transport errors, checked by name so this module
+    # doesn't import either library
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    if names & {
+        "TimeoutException",
+        "WebDriverException",
+        "TransportError",
+        "TimeoutError",
+        "ConnectionError",
+        "OSError",
+    }:
+        return TransientScrapeError(str(exc) or type(exc).__name__)
+
+    return PermanentScrapeError(str(exc) or type(exc).__name__)
+
+
+def check_blocked(page_source, url=""):
+    """Raise BlockedError if a fetched page is an anti-bot or consent page"""
+    text = f"{url}\n{page_source[:20000]}".lower()
+    for marker in BLOCKED_MARKERS:
+        if marker in text:
+            raise BlockedError(f"Blocked by YouTube ({marker})")
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=30.0):
+    """Full-jitter exponential backoff for the given 0-based attempt"""
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
+
+
+class CircuitBreaker:
+    """Fail fast after ``failure_threshold`` consecutive failures
+
+    Once open, calls are rejected with CircuitOpenError for ``reset_timeout``
+    seconds; then a single trial call is let through (half-open) and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, host, failure_threshold=5, reset_timeout=60.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go ahead"""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self._trial_in_flight:
+                raise CircuitOpenError(
+                    f"Circuit open for {self.host} (retry in {max(remaining, 0):.0f}s)"
+                )
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def release(self):
+        """End a call that says nothing about the host, leaving its state"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host=YOUTUBE_HOST):
+    """The process-wide circuit breaker for ``host``"""
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def _record(breaker, error):
+    # Permanent errors say nothing about whether the host is blocking us
+    if error.retryable:
+        breaker.record_failure()
+    else:
+        breaker.release()
+
+
+def call_with_retry(
+    func,
+    *args,
+    host=YOUTUBE_HOST,
+    attempts=3,
+    base_delay=1.0,
+    max_delay=30.0,
+    setup=None,
+    **kwargs,
+):
+    """Call ``func`` with retries and the host's circuit breaker
+
+    ``setup()``, if given, runs before every attempt once the breaker has
+    let it through (e.g. starting a browser): its errors are raised as they
+    are and never count as failures of the host. Raises the classified
+    ScrapeError of the last attempt.
+    """
+    breaker = get_breaker(host)
+    for attempt in range(attempts):
+        breaker.before_call()
+        if setup is not None:
+            try:
+                setup()
+            except Exception:
+                breaker.release()
+                raise
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            error = classify_error(e)
+            _record(breaker, error)
+            if not error.retryable or attempt == attempts - 1:
+                if error is e:
+                    raise
+                raise error from e
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            print(f"  Retrying in {delay:.1f}s after: {error}")
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+async def call_with_retry_async(
+    func, *args, host=YOUTUBE_HOST, attempts=3, base_delay=1.0, max_delay=30.0, **kwargs
+):
+    """Async counterpart of ``call_with_retry`` for coroutine functions"""
+    breaker = get_breaker(host)
+    for attempt in range(attempts):
+        breaker.before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            error = classify_error(e)
+            _record(breaker, error)
+            if not error.retryable or attempt == attempts - 1:
+                if error is e:
+                    raise
+                raise error from e
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            print(f"  Retrying in {delay:.1f}s after: {error}")
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
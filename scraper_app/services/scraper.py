@@ -3,21 +3,106 @@ YouTube Playlist Scraper - Separate JSON files for playlists and videos
 """
 
 import os
-import json
 import re
+import shutil
 import time
 from datetime import datetime
+from functools import lru_cache
 
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 
+from .resilience import DriverError, ScrapeError, call_with_retry, check_blocked
+
+# Storage functions are re-exported here for backwards compatibility
+from .storage import (
+    BASE_DIR,
+    PLAYLISTS_FILE,
+    VIDEOS_DIR,
+    get_playlists,
+    save_playlists,
+    get_playlist_videos,
+    save_playlist_videos,
+    upsert_playlist,
+    save_scraped_videos,
+    save_scraped_playlist,
+    get_checkpoint,
+    save_checkpoint,
+    delete_checkpoint,
+    get_playlist_by_id,
+    get_video_by_id,
+    get_playlists_by_ids,
+    iter_playlists,
+    iter_videos,
+    get_videos_by_ids,
+    load_from_json,
+)
+
+
+# Resolved chromedriver path, persisted so later processes skip the lookup
+CHROMEDRIVER_CACHE_FILE = os.path.join(BASE_DIR, ".chromedriver_path")
+
+
+@lru_cache(maxsize=None)
+def resolve_chromedriver():
+    """Find chromedriver once per process, without the network if possible
+
+    Order: $CHROMEDRIVER_PATH, the path cached by a previous run, chromedriver
+    on $PATH, then webdriver_manager (network). Returns None if all of those
+    fail, leaving it to Selenium Manager.
+    """
+    path = os.environ.get("CHROMEDRIVER_PATH")
+    if path:
+        return path
+
+    path = _cached_chromedriver()
+    if path:
+        return path
+
+    path = shutil.which("chromedriver")
+    if path:
+        return path
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-PLAYLISTS_FILE = os.path.join(BASE_DIR, "playlists.json")
-VIDEOS_DIR = os.path.join(BASE_DIR, "videos")
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        path = ChromeDriverManager().install()
+    except Exception as e:
+        print(f"Could not resolve chromedriver: {e}")
+        return None
+
+    with open(CHROMEDRIVER_CACHE_FILE, "w", encoding="utf-8") as f:
+        f.write(path)
+    return path
+
+
+def _cached_chromedriver():
+    """Path cached by a previous run, if it still exists"""
+    if os.path.exists(CHROMEDRIVER_CACHE_FILE):
+        with open(CHROMEDRIVER_CACHE_FILE, "r", encoding="utf-8") as f:
+            path = f.read().strip()
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+def forget_cached_chromedriver():
+    """Drop the cached chromedriver path if it is the one in use
+
+    Called when the browser fails to start: after Chrome auto-updates, the
+    cached driver no longer matches it. Returns True if there was a cached
+    path to drop, i.e. resolving again may find a working driver.
+    """
+    if os.environ.get("CHROMEDRIVER_PATH"):
+        return False
+    cached = _cached_chromedriver()
+    if cached is None or resolve_chromedriver() != cached:
+        return False
+    os.remove(CHROMEDRIVER_CACHE_FILE)
+    resolve_chromedriver.cache_clear()
+    return True
 
 
 def get_driver():
@@ -40,7 +125,7 @@ def get_driver():
     )
 
     driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()), options=chrome_options
+        service=Service(resolve_chromedriver()), options=chrome_options
     )
 
     # Additional stealth measures
@@ -58,281 +143,373 @@ def get_driver():
     return driver
 
 
-def scrape_playlists(query, max_playlists=15):
-    """Scrape playlist search results"""
-    driver = None
-    playlists = []
+class DriverSession:
+    """One browser reused across many fetches
 
-    try:
-        driver = get_driver()
-        search_url = f"https://www.youtube.com/results?search_query={query}+playlist"
-
-        print(f"🔍 Searching for '{query}' playlists...")
-        driver.get(search_url)
-
-        # Wait longer for page to load
-        time.sleep(3)
-
-        # Scroll to load results
-        for _ in range(5):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-
-        # Try different selectors
-        playlist_renderers = soup.find_all("ytd-playlist-renderer")
-
-        if not playlist_renderers:
-            # Try alternative: find links to playlists
-            playlist_links = soup.find_all("a", href=re.compile(r"/playlist\?list="))
-            for link in playlist_links[:max_playlists]:
-                href = link.get("href", "")
-                match = re.search(r"/playlist\?list=([A-Za-z0-9_-]+)", href)
-                if match:
-                    playlist_id = match.group(1)
-                    title = link.get("title", "") or "Untitled Playlist"
-                    thumbnail = (
-                        f"https://img.youtube.com/vi/{playlist_id}/hqdefault.jpg"
-                    )
+    The browser is started on first use and restarted after a failed fetch,
+    since its state is unknown at that point. Raises DriverError if it
+    can't be started.
+    """
 
-                    if playlist_id not in [p.get("playlist_id") for p in playlists]:
-                        playlists.append(
-                            {
-                                "playlist_id": playlist_id,
-                                "url": f"https://www.youtube.com/playlist?list={playlist_id}",
-                                "title": title[:200],
-                                "thumbnail": thumbnail,
-                                "video_count": 0,
-                            }
-                        )
-        else:
-            # Original method
-            seen_ids = set()
-            for renderer in playlist_renderers:
-                if len(playlists) >= max_playlists:
-                    break
-
-                link = renderer.find("a", href=re.compile(r"/playlist\?list="))
-                if not link:
-                    continue
+    def __init__(self):
+        self._driver = None
 
-                href = link.get("href", "")
-                match = re.search(r"/playlist\?list=([A-Za-z0-9_-]+)", href)
-                if not match:
-                    continue
+    def __enter__(self):
+        return self
 
-                playlist_id = match.group(1)
-                if playlist_id in seen_ids:
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        """Start the browser unless it is already running
+
+        If a cached chromedriver fails to start, the cache is dropped and
+        the driver resolved again once.
+        """
+        if self._driver is not None:
+            return
+        for retry in (True, False):
+            try:
+                self._driver = get_driver()
+                return
+            except Exception as e:
+                if retry and forget_cached_chromedriver():
+                    print(f"Cached chromedriver failed, resolving again: {e}")
                     continue
-                seen_ids.add(playlist_id)
-
-                title = "Untitled Playlist"
-                title_elem = renderer.find("yt-formatted-string")
-                if title_elem:
-                    title = title_elem.get_text(strip=True)
-                if not title:
-                    title = link.get("title", "") or "Untitled Playlist"
-
-                thumbnail = f"https://img.youtube.com/vi/{playlist_id}/hqdefault.jpg"
-                img = renderer.find("img")
-                if img and img.get("src"):
-                    thumbnail = img.get("src")
-
-                playlists.append(
-                    {
-                        "playlist_id": playlist_id,
-                        "url": f"https://www.youtube.com/playlist?list={playlist_id}",
-                        "title": title[:200],
-                        "thumbnail": thumbnail,
-                        "video_count": 0,
-                    }
-                )
+                raise DriverError(f"Could not start the browser: {e}") from e
+
+    def run(self, load, *args):
+        """Call ``load(driver, *args)`` on the shared browser"""
+        self.start()
+        try:
+            return load(self._driver, *args)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            finally:
+                self._driver = None
+
+
+def _run_in_browser(load, *args, session=None):
+    """Run ``load`` with retries in the session's browser, or a throwaway one
+
+    The browser is started outside the retried call, so a broken local
+    chromedriver raises DriverError without tripping YouTube's circuit
+    breaker.
+    """
+    if session is None:
+        with DriverSession() as session:
+            return _run_in_browser(load, *args, session=session)
+    return call_with_retry(session.run, load, *args, setup=session.start)
+
+
+def _load_search_page(driver, query):
+    search_url = f"https://www.youtube.com/results?search_query={query}+playlist"
+    driver.get(search_url)
+
+    # Wait longer for page to load
+    time.sleep(3)
+
+    # Scroll to load results
+    for _ in range(5):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(1)
 
-        print(f"  Found {len(playlists)} playlists")
-        return playlists
+    check_blocked(driver.page_source, driver.current_url)
+    return driver.page_source
 
-    except Exception as e:
-        print(f"Error: {e}")
-        import traceback
 
-        traceback.print_exc()
-        return playlists
-    finally:
-        if driver:
-            driver.quit()
+def fetch_search_page(query, session=None):
+    """Load the playlist search results in a browser and return the HTML
 
+    Retried on transient failures; raises ScrapeError.
+    """
+    return _run_in_browser(_load_search_page, query, session=session)
 
-def scrape_playlist_videos(playlist_id, playlist_url, max_videos=50):
-    """Scrape all videos from a playlist"""
-    driver = None
-    videos = []
 
-    try:
-        driver = get_driver()
-        print(f"  📂 Scraping videos...")
+def scrape_playlists(query, max_playlists=15, session=None):
+    """Scrape playlist search results
 
-        driver.get(playlist_url)
-        time.sleep(1)
+    Pass a DriverSession to reuse its browser. Raises ScrapeError if the
+    page can't be fetched after retries.
+    """
+    playlists = []
 
-        last_height = driver.execute_script(
-            "return document.documentElement.scrollHeight"
-        )
-        for _ in range(5):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(0.5)
-            new_height = driver.execute_script(
-                "return document.documentElement.scrollHeight"
-            )
-            if new_height == last_height:
-                break
-            last_height = new_height
+    print(f"🔍 Searching for '{query}' playlists...")
+    html = fetch_search_page(query, session=session)
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Try different selectors
+    playlist_renderers = soup.find_all("ytd-playlist-renderer")
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        video_elements = soup.find_all("ytd-playlist-video-renderer")
+    if not playlist_renderers:
+        # Try alternative: find links to playlists
+        playlist_links = soup.find_all("a", href=re.compile(r"/playlist\?list="))
+        for link in playlist_links[:max_playlists]:
+            href = link.get("href", "")
+            match = re.search(r"/playlist\?list=([A-Za-z0-9_-]+)", href)
+            if match:
+                playlist_id = match.group(1)
+                title = link.get("title", "") or "Untitled Playlist"
+                thumbnail = (
+                    f"https://img.youtube.com/vi/{playlist_id}/hqdefault.jpg"
+                )
 
-        for idx, elem in enumerate(video_elements[:max_videos], 1):
-            link = elem.find("a", id="video-title")
+                if playlist_id not in [p.get("playlist_id") for p in playlists]:
+                    playlists.append(
+                        {
+                            "playlist_id": playlist_id,
+                            "url": f"https://www.youtube.com/playlist?list={playlist_id}",
+                            "title": title[:200],
+                            "thumbnail": thumbnail,
+                            "video_count": 0,
+                        }
+                    )
+    else:
+        # Original method
+        seen_ids = set()
+        for renderer in playlist_renderers:
+            if len(playlists) >= max_playlists:
+                break
+
+            link = renderer.find("a", href=re.compile(r"/playlist\?list="))
             if not link:
                 continue
 
-            video_url = link.get("href", "")
-            video_title = link.get("title", "") or link.get_text(strip=True)
+            href = link.get("href", "")
+            match = re.search(r"/playlist\?list=([A-Za-z0-9_-]+)", href)
+            if not match:
+                continue
 
-            vid_match = re.search(r"v=([A-Za-z0-9_-]+)", video_url)
-            if not vid_match:
+            playlist_id = match.group(1)
+            if playlist_id in seen_ids:
                 continue
+            seen_ids.add(playlist_id)
 
-            video_id = vid_match.group(1)
-            thumb = elem.find("img")
-            thumbnail = (
-                thumb.get("src", "")
-                if thumb
-                else f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
-            )
+            title = "Untitled Playlist"
+            title_elem = renderer.find("yt-formatted-string")
+            if title_elem:
+                title = title_elem.get_text(strip=True)
+            if not title:
+                title = link.get("title", "") or "Untitled Playlist"
+
+            thumbnail = f"https://img.youtube.com/vi/{playlist_id}/hqdefault.jpg"
+            img = renderer.find("img")
+            if img and img.get("src"):
+                thumbnail = img.get("src")
 
-            videos.append(
+            playlists.append(
                 {
-                    "position": idx,
-                    "video_id": video_id,
-                    "title": video_title[:300],
-                    "url": f"https://www.youtube.com/watch?v={video_id}",
+                    "playlist_id": playlist_id,
+                    "url": f"https://www.youtube.com/playlist?list={playlist_id}",
+                    "title": title[:200],
                     "thumbnail": thumbnail,
+                    "video_count": 0,
                 }
             )
 
-        return videos
+    print(f"  Found {len(playlists)} playlists")
+    return playlists
 
-    except Exception as e:
-        print(f"Error: {e}")
-        return videos
-    finally:
-        if driver:
-            driver.quit()
 
+def _load_playlist_page(driver, playlist_url):
+    driver.get(playlist_url)
+    time.sleep(1)
+
+    last_height = driver.execute_script("return document.documentElement.scrollHeight")
+    for _ in range(5):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(0.5)
+        new_height = driver.execute_script(
+            "return document.documentElement.scrollHeight"
+        )
+        if new_height == last_height:
+            break
+        last_height = new_height
 
-# JSON Functions
-def get_playlists():
-    """Load playlists from JSON"""
-    if os.path.exists(PLAYLISTS_FILE):
-        with open(PLAYLISTS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    check_blocked(driver.page_source, driver.current_url)
+    return driver.page_source
 
 
-def save_playlists(playlists):
-    """Save playlists to JSON"""
-    with open(PLAYLISTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(playlists, f, indent=2, ensure_ascii=False)
+def fetch_playlist_page(playlist_url, session=None):
+    """Load a playlist in a browser, scrolled to the end, and return the HTML
 
+    Retried on transient failures; raises ScrapeError.
+    """
+    return _run_in_browser(_load_playlist_page, playlist_url, session=session)
 
-def get_playlist_videos(playlist_id):
-    """Load videos for a specific playlist"""
-    os.makedirs(VIDEOS_DIR, exist_ok=True)
-    video_file = os.path.join(VIDEOS_DIR, f"{playlist_id}.json")
 
-    if os.path.exists(video_file):
-        with open(video_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return None
+def scrape_playlist_videos(playlist_id, playlist_url, max_videos=50, session=None):
+    """Scrape all videos from a playlist
 
+    Pass a DriverSession to reuse its browser. Raises ScrapeError if the
+    page can't be fetched after retries.
+    """
+    videos = []
 
-def save_playlist_videos(playlist_id, videos):
-    """Save playlist videos to JSON"""
-    os.makedirs(VIDEOS_DIR, exist_ok=True)
-    video_file = os.path.join(VIDEOS_DIR, f"{playlist_id}.json")
-    with open(video_file, "w", encoding="utf-8") as f:
-        json.dump(videos, f, indent=2, ensure_ascii=False)
+    print(f"  📂 Scraping videos...")
+    html = fetch_playlist_page(playlist_url, session=session)
+    soup = BeautifulSoup(html, "html.parser")
+    video_elements = soup.find_all("ytd-playlist-video-renderer")
+
+    for idx, elem in enumerate(video_elements[:max_videos], 1):
+        link = elem.find("a", id="video-title")
+        if not link:
+            continue
+
+        video_url = link.get("href", "")
+        video_title = link.get("title", "") or link.get_text(strip=True)
+
+        vid_match = re.search(r"v=([A-Za-z0-9_-]+)", video_url)
+        if not vid_match:
+            continue
+
+        video_id = vid_match.group(1)
+        thumb = elem.find("img")
+        thumbnail = (
+            thumb.get("src", "")
+            if thumb
+            else f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
+        )
 
+        videos.append(
+            {
+                "position": idx,
+                "video_id": video_id,
+                "title": video_title[:300],
+                "url": f"https://www.youtube.com/watch?v={video_id}",
+                "thumbnail": thumbnail,
+            }
+        )
 
-def get_playlist_by_id(playlist_id):
-    """Get playlist by ID with videos"""
-    playlists = get_playlists()
-    for p in playlists:
-        if p.get("playlist_id") == playlist_id:
-            videos = get_playlist_videos(playlist_id)
-            if videos:
-                p["videos"] = videos
-            return p
-    return None
+    return videos
 
 
-def get_video_by_id(video_id):
-    """Find video by ID"""
-    playlists = get_playlists()
-    for playlist in playlists:
-        videos = get_playlist_videos(playlist.get("playlist_id"))
-        if videos:
-            for video in videos:
-                if video.get("video_id") == video_id:
-                    return video, playlist
-    return None, None
+# Streaming pipeline: discover -> fetch -> parse -> persist
+def scrape_playlist(playlist, index=0, session=None):
+    """Copy of ``playlist`` with its ``videos`` attached
 
+    If the videos couldn't be scraped the copy gets ``partial`` and
+    ``error`` set and ``videos`` left as None.
+    """
+    playlist = dict(playlist)
+    try:
+        videos = scrape_playlist_videos(
+            playlist["playlist_id"], playlist["url"], session=session
+        )
+    except ScrapeError as e:
+        print(f"Error: {e}")
+        playlist["partial"] = True
+        playlist["error"] = str(e)
+        playlist["videos"] = None
+        return playlist
 
-def search_and_scrape_playlists(query, max_playlists=12):
-    """Main function: scrape playlists then scrape videos for each"""
-    print(f"\n=== Scraping: {query} ===")
+    playlist["videos"] = videos
+    playlist["video_count"] = len(videos)
 
-    # Step 1: Get playlists
-    playlists = scrape_playlists(query, max_playlists)
+    if videos:
+        # Update thumbnail from first video
+        if videos[0].get("thumbnail"):
+            playlist["thumbnail"] = videos[0]["thumbnail"]
+        # Update title if we don't have one
+        if not playlist.get("title") or playlist["title"] == "Untitled Playlist":
+            playlist["title"] = f"Playlist {index + 1}"
 
-    if not playlists:
-        print("No playlists found")
-        return None
+    return playlist
 
-    # Step 2: Get videos for each playlist
+
+def iter_scraped_playlists(playlists, skip_ids=(), session=None):
+    """Scrape each playlist's videos, yielding it as soon as it's done
+
+    See ``scrape_playlist`` for what is yielded.
+    """
     for i, playlist in enumerate(playlists):
-        print(f"\n[{i + 1}/{len(playlists)}] Processing playlist...")
-        videos = scrape_playlist_videos(playlist["playlist_id"], playlist["url"])
-        playlist["video_count"] = len(videos)
-
-        if videos:
-            save_playlist_videos(playlist["playlist_id"], videos)
-            # Update thumbnail from first video
-            if videos[0].get("thumbnail"):
-                playlist["thumbnail"] = videos[0]["thumbnail"]
-            # Update title if we don't have one
-            if not playlist.get("title") or playlist["title"] == "Untitled Playlist":
-                playlist["title"] = f"Playlist {i + 1}"
+        if playlist["playlist_id"] in skip_ids:
+            continue
 
+        print(f"\n[{i + 1}/{len(playlists)}] Processing playlist...")
+        yield scrape_playlist(playlist, i, session=session)
         time.sleep(0.5)
 
-    # Step 3: Save playlists
-    save_playlists(playlists)
 
-    print(f"\n✅ Done! {len(playlists)} playlists saved")
+def scrape_query(query, max_playlists=12):
+    """Scrape playlists and their videos without saving anything
+
+    Yields each playlist as soon as its videos are in (see
+    ``iter_scraped_playlists``). Raises ScrapeError if the search fails.
+    """
+    yield from iter_scraped_playlists(scrape_playlists(query, max_playlists))
+
+
+def stream_scrape_playlists(query, max_playlists=12, resume=True):
+    """Scrape playlists into the JSON files one at a time
+
+    Each playlist is persisted as soon as it is scraped and then yielded
+    (without videos). Progress is checkpointed, so an interrupted scrape of
+    the same query picks up where it stopped: the playlists it had already
+    saved are put back into the listing and yielded first. Raises
+    ScrapeError if the search fails.
+    """
+    checkpoint = get_checkpoint(query) if resume else None
+    if checkpoint:
+        playlists = checkpoint["playlists"]
+        saved = checkpoint["saved"]
+        print(f"  Resuming: {len(saved)}/{len(playlists)} playlists already saved")
+        # Other searches may have replaced the listing since the checkpoint
+        save_playlists(saved)
+        yield from saved
+    else:
+        playlists = scrape_playlists(query, max_playlists)
+        if not playlists:
+            return
+        saved = []
+        save_checkpoint(query, playlists, saved)
+        # Results of a new search replace the previous ones
+        save_playlists([])
+
+    done = {p["playlist_id"] for p in saved}
+    for playlist in iter_scraped_playlists(playlists, skip_ids=done):
+        entry = save_scraped_playlist(playlist)
+        saved.append(entry)
+        save_checkpoint(query, playlists, saved)
+        yield entry
+
+    delete_checkpoint(query)
+
+
+def search_and_scrape_playlists(query, max_playlists=12):
+    """Main function: scrape playlists then scrape videos for each
+
+    Playlists are saved one by one as they complete (see
+    ``stream_scrape_playlists``); those whose videos couldn't be scraped are
+    saved with ``partial`` set and keep their previously stored videos.
+    """
+    print(f"\n=== Scraping: {query} ===")
+
+    scraped = 0
+    partial = 0
+    try:
+        for playlist in stream_scrape_playlists(query, max_playlists):
+            scraped += 1
+            if playlist.get("partial"):
+                partial += 1
+    except ScrapeError as e:
+        print(f"Error: {e}")
+        return None
+
+    if not scraped:
+        print("No playlists found")
+        return None
+
+    print(f"\n✅ Done! {scraped} playlists saved ({partial} partial)")
     return {
         "search_query": query,
         "scraped_at": datetime.now().isoformat(),
-        "total_playlists": len(playlists),
+        "total_playlists": scraped,
+        "partial_playlists": partial,
     }
-
-
-def load_from_json():
-    """For compatibility - returns playlists with videos"""
-    playlists = get_playlists()
-    for p in playlists:
-        videos = get_playlist_videos(p.get("playlist_id"))
-        if videos:
-            p["videos"] = videos
-    return {"playlists": playlists} if playlists else None
@@ -0,0 +1,557 @@
+"""
+JSON storage for scraped playlists and videos
+
+Kept free of the scraping stack (Selenium, bs4) so read-only web workers can
+serve pages without importing it.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialised
+    fcntl = None
+
+from .records import CatalogueEntry
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLAYLISTS_FILE = os.path.join(BASE_DIR, "playlists.json")
+VIDEOS_DIR = os.path.join(BASE_DIR, "videos")
+CATALOGUE_FILE = os.path.join(BASE_DIR, "video_catalogue.ndjson")
+# Catalogues written by older versions: a whole-file index, and before
+# that one file per video
+LEGACY_CATALOGUE_FILE = os.path.join(BASE_DIR, "video_catalogue.json")
+LEGACY_CATALOGUE_DIR = os.path.join(VIDEOS_DIR, "catalogue")
+CHECKPOINTS_DIR = os.path.join(BASE_DIR, "checkpoints")
+LOCK_FILE = os.path.join(BASE_DIR, "storage.lock")
+
+# Checkpoints older than this are ignored: the listing they resume has long
+# been replaced by other searches
+CHECKPOINT_MAX_AGE = 6 * 60 * 60
+
+# The catalogue log is compacted once it holds this many times more lines
+# than live entries (and at least CATALOGUE_COMPACT_MIN_LINES)
+CATALOGUE_COMPACT_RATIO = 2
+CATALOGUE_COMPACT_MIN_LINES = 1000
+
+_thread_lock = threading.RLock()
+_lock_state = threading.local()
+
+
+@contextmanager
+def storage_lock():
+    """Serialise read-modify-write of the JSON files
+
+    Held across threads and, through a lock file, across processes (web
+    workers, management commands). Re-entrant within a thread.
+    """
+    with _thread_lock:
+        depth = getattr(_lock_state, "depth", 0)
+        _lock_state.depth = depth + 1
+        try:
+            if depth or fcntl is None:
+                yield
+                return
+            with open(LOCK_FILE, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            _lock_state.depth = depth
+
+
+def _write_json(path, data):
+    """Write JSON atomically, so readers never see a half-written file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def get_playlists():
+    """Load playlists from JSON"""
+    if os.path.exists(PLAYLISTS_FILE):
+        with open(PLAYLISTS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return []
+
+
+def save_playlists(playlists):
+    """Save playlists to JSON
+
+    Catalogue memberships follow the listing: playlists dropped from it are
+    removed from their videos' entries, (re)listed ones added back.
+    """
+    with storage_lock():
+        old_ids = {p.get("playlist_id") for p in get_playlists()}
+        new_ids = [p.get("playlist_id") for p in playlists]
+        _write_json(PLAYLISTS_FILE, playlists)
+
+        catalogue = _load_catalogue()
+        changed = {}
+        for playlist_id in old_ids - set(new_ids):
+            for ref in _read_playlist_file(playlist_id) or []:
+                _remove_from_catalogue(catalogue, changed, ref["video_id"], playlist_id)
+        for playlist_id in [p for p in new_ids if p not in old_ids]:
+            for ref in _read_playlist_file(playlist_id) or []:
+                _add_to_catalogue(catalogue, changed, ref, playlist_id, listed=True)
+        _append_catalogue(changed)
+
+
+def upsert_playlist(playlist):
+    """Insert or replace a single playlist in the playlists JSON"""
+    with storage_lock():
+        playlists = get_playlists()
+        for i, p in enumerate(playlists):
+            if p.get("playlist_id") == playlist["playlist_id"]:
+                playlists[i] = playlist
+                break
+        else:
+            playlists.append(playlist)
+        save_playlists(playlists)
+
+
+def _read_playlist_file(playlist_id):
+    """Raw contents of a playlist's videos file, or None"""
+    os.makedirs(VIDEOS_DIR, exist_ok=True)
+    video_file = os.path.join(VIDEOS_DIR, f"{playlist_id}.json")
+
+    if os.path.exists(video_file):
+        with open(video_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return None
+
+
+def _video_from_catalogue(ref, entry):
+    """Full video dict for a playlist reference and its catalogue entry"""
+    video_id = ref["video_id"]
+    if entry is None:
+        entry = CatalogueEntry(video_id)
+    return {
+        "position": ref.get("position", 0),
+        "video_id": video_id,
+        "title": entry.title,
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "thumbnail": entry.thumbnail,
+    }
+
+
+def get_playlist_videos(playlist_id):
+    """Load videos for a specific playlist, resolved from the catalogue"""
+    refs = _read_playlist_file(playlist_id)
+    if refs is None:
+        return None
+    return _resolve_refs(refs, _load_catalogue())
+
+
+def _resolve_refs(refs, catalogue):
+    videos = []
+    for ref in refs:
+        if "title" in ref:
+            # Full copy written before the catalogue existed
+            videos.append(ref)
+        else:
+            entry = catalogue.get(ref["video_id"])
+            videos.append(_video_from_catalogue(ref, entry))
+    return videos
+
+
+def save_playlist_videos(playlist_id, videos):
+    """Save playlist videos: details go to the global catalogue, the
+    playlist's own file only keeps ordered references
+
+    The playlist is only recorded as containing its videos while it is
+    listed (see ``save_playlists``).
+    """
+    os.makedirs(VIDEOS_DIR, exist_ok=True)
+    with storage_lock():
+        old_ids = {ref["video_id"] for ref in _read_playlist_file(playlist_id) or []}
+        new_ids = {v["video_id"] for v in videos}
+        listed = any(p.get("playlist_id") == playlist_id for p in get_playlists())
+
+        catalogue = _load_catalogue()
+        changed = {}
+        for video in videos:
+            _add_to_catalogue(catalogue, changed, video, playlist_id, listed)
+        for video_id in old_ids - new_ids:
+            _remove_from_catalogue(catalogue, changed, video_id, playlist_id)
+        _append_catalogue(changed)
+
+        video_file = os.path.join(VIDEOS_DIR, f"{playlist_id}.json")
+        _write_json(
+            video_file,
+            [{"position": v.get("position", 0), "video_id": v["video_id"]} for v in videos],
+        )
+
+
+def save_scraped_videos(playlist):
+    """Persist the ``videos`` of a freshly scraped playlist
+
+    Partial playlists (``videos`` is None) keep their previously stored
+    videos. Returns the playlist's listing entry, without videos; it is
+    not added to the listing.
+    """
+    playlist = dict(playlist)
+    videos = playlist.pop("videos", None)
+    if videos is None:
+        stored = get_playlist_videos(playlist["playlist_id"]) or []
+        playlist["video_count"] = len(stored)
+    elif videos:
+        save_playlist_videos(playlist["playlist_id"], videos)
+    return playlist
+
+
+def save_scraped_playlist(playlist):
+    """Persist one freshly scraped playlist (with its ``videos``)
+
+    See ``save_scraped_videos``; the entry is also upserted into the
+    listing. Returns the entry as saved.
+    """
+    playlist = save_scraped_videos(playlist)
+    upsert_playlist(playlist)
+    return playlist
+
+
+def get_playlist_by_id(playlist_id):
+    """Get playlist by ID with videos"""
+    playlists = get_playlists()
+    for p in playlists:
+        if p.get("playlist_id") == playlist_id:
+            videos = get_playlist_videos(playlist_id)
+            if videos:
+                p["videos"] = videos
+            return p
+    return None
+
+
+def get_video_by_id(video_id):
+    """Find video by ID, with the first listed playlist containing it"""
+    found = get_videos_by_ids([video_id]).get(video_id)
+    if not found:
+        return None, None
+    playlist = get_playlists_by_ids([found["playlist_id"]])[found["playlist_id"]]
+    return found, playlist
+
+
+def get_playlists_by_ids(playlist_ids):
+    """Batch lookup: playlists keyed by ID, read in a single pass"""
+    wanted = set(playlist_ids)
+    return {
+        p["playlist_id"]: p
+        for p in get_playlists()
+        if p.get("playlist_id") in wanted
+    }
+
+
+def _index_after(playlist_ids, after_id):
+    """Index just past ``after_id``; KeyError if it is no longer listed"""
+    try:
+        return playlist_ids.index(after_id) + 1
+    except ValueError:
+        raise KeyError(after_id) from None
+
+
+def iter_playlists(after=None):
+    """Iterate the listed playlists, starting after the playlist ID ``after``
+
+    Raises KeyError if ``after`` is no longer listed.
+    """
+    playlists = get_playlists()
+    start = 0
+    if after is not None:
+        start = _index_after([p.get("playlist_id") for p in playlists], after)
+    return iter(playlists[start:])
+
+
+def iter_videos(playlist_ids=None, after=None):
+    """Iterate every stored video tagged with the playlist it belongs to
+
+    Videos are tagged with ``playlist_id`` and ``playlist_ids`` (as in
+    ``get_videos_by_ids``) and come in listing, then position order. With
+    ``after`` = (playlist_id, position) iteration starts after that video;
+    raises KeyError if its playlist is no longer listed.
+    """
+    listed = [p.get("playlist_id") for p in get_playlists()]
+    selected = [p for p in listed if playlist_ids is None or p in playlist_ids]
+    after_position = None
+    if after is not None:
+        after_id, after_position = after
+        after_position = int(after_position)
+        selected = selected[_index_after(selected, after_id) - 1 :]
+    return _iter_videos(listed, selected, after_position)
+
+
+def _iter_videos(listed, selected, after_position):
+    catalogue = _load_catalogue()
+    order = {playlist_id: i for i, playlist_id in enumerate(listed)}
+    for playlist_id in selected:
+        refs = _read_playlist_file(playlist_id) or []
+        if after_position is not None:
+            # Only the first playlist is resumed part way through
+            refs = [r for r in refs if r.get("position", 0) > after_position]
+            after_position = None
+        for video in _resolve_refs(refs, catalogue):
+            entry = catalogue.get(video["video_id"])
+            containing = set(entry.playlists if entry else ())
+            containing.add(playlist_id)
+            yield dict(
+                video,
+                playlist_id=playlist_id,
+                playlist_ids=sorted(
+                    (p for p in containing if p in order), key=order.get
+                ),
+            )
+
+
+def get_videos_by_ids(video_ids):
+    """Batch lookup: videos keyed by ID, each tagged with the first listed
+    playlist containing it and ``playlist_ids``, all listed ones that do"""
+    listed = [p.get("playlist_id") for p in get_playlists()]
+    catalogue = _load_catalogue()
+    found = {}
+    for video_id in dict.fromkeys(video_ids):
+        entry = catalogue.get(video_id)
+        if not entry:
+            continue
+        containing = set(entry.playlists)
+        playlist_ids = [p for p in listed if p in containing]
+        if not playlist_ids:
+            continue
+
+        ref = {"video_id": video_id}
+        for r in _read_playlist_file(playlist_ids[0]) or []:
+            if r["video_id"] == video_id:
+                ref = r
+                break
+        video = _video_from_catalogue(ref, entry)
+        video["playlist_id"] = playlist_ids[0]
+        video["playlist_ids"] = playlist_ids
+        found[video_id] = video
+    return found
+
+
+def load_from_json():
+    """For compatibility - returns playlists with videos"""
+    playlists = get_playlists()
+    for p in playlists:
+        videos = get_playlist_videos(p.get("playlist_id"))
+        if videos:
+            p["videos"] = videos
+    return {"playlists": playlists} if playlists else None
+
+
+# Scrape checkpoints
+def _checkpoint_file(query):
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CHECKPOINTS_DIR, f"{digest}.json")
+
+
+def get_checkpoint(query, max_age=CHECKPOINT_MAX_AGE):
+    """Load the checkpoint of an unfinished scrape of ``query``
+
+    Checkpoints older than ``max_age`` seconds are deleted and ignored.
+    """
+    checkpoint_file = _checkpoint_file(query)
+    if not os.path.exists(checkpoint_file):
+        return None
+    with open(checkpoint_file, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+
+    if time.time() - checkpoint.get("saved_at", 0) > max_age:
+        delete_checkpoint(query)
+        return None
+    return checkpoint
+
+
+def save_checkpoint(query, playlists, saved):
+    """Record the discovered playlists and the entries persisted so far"""
+    os.makedirs(CHECKPOINTS_DIR, exist_ok=True)
+    _write_json(
+        _checkpoint_file(query),
+        {
+            "query": query,
+            "saved_at": time.time(),
+            "playlists": playlists,
+            "saved": saved,
+        },
+    )
+
+
+def delete_checkpoint(query):
+    checkpoint_file = _checkpoint_file(query)
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+
+# Global video catalogue: an append-only log with one JSON line per entry
+# change, mapping a video ID to its title, thumbnail and the listed
+# playlists containing it (the last line for an ID wins). Each process
+# parses it into compact CatalogueEntry records once, then only reads the
+# lines appended since; compaction rewrites it with one line per video.
+_catalogue_cache = {"key": None, "offset": 0, "lines": 0, "data": {}}
+_catalogue_lock = threading.Lock()
+
+
+def _load_catalogue():
+    """The catalogue as {video_id: CatalogueEntry}; shared, treat as read-only"""
+    try:
+        f = open(CATALOGUE_FILE, "rb")
+    except FileNotFoundError:
+        return {}
+    with f, _catalogue_lock:
+        stat = os.fstat(f.fileno())
+        cache = _catalogue_cache
+        key = (CATALOGUE_FILE, stat.st_dev, stat.st_ino)
+        if cache["key"] != key or stat.st_size < cache["offset"]:
+            # New or compacted file: parse it from the start
+            cache.update(key=key, offset=0, lines=0, data={})
+        if stat.st_size > cache["offset"]:
+            f.seek(cache["offset"])
+            tail = f.read(stat.st_size - cache["offset"])
+            # A line still being appended is picked up by a later read
+            tail = tail[: tail.rfind(b"\n") + 1]
+            data = cache["data"]
+            for line in tail.splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                video_id = entry["video_id"]
+                data[video_id] = CatalogueEntry.from_dict(video_id, entry)
+                cache["lines"] += 1
+            cache["offset"] += len(tail)
+        return cache["data"]
+
+
+def _catalogue_line(entry):
+    line = dict(video_id=entry.video_id, **entry.to_dict())
+    return json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _append_catalogue(changed):
+    """Append changed entries to the log; caller holds ``storage_lock``"""
+    if not changed:
+        return
+    _load_catalogue()
+    offset = _catalogue_cache["offset"] if os.path.exists(CATALOGUE_FILE) else 0
+    with open(CATALOGUE_FILE, "ab") as f:
+        # Drop the torn last line of a writer that died mid-append
+        f.truncate(offset)
+        f.write("".join(_catalogue_line(e) for e in changed.values()).encode("utf-8"))
+    catalogue = _load_catalogue()
+
+    lines = _catalogue_cache["lines"]
+    if lines >= CATALOGUE_COMPACT_MIN_LINES and lines > CATALOGUE_COMPACT_RATIO * len(
+        catalogue
+    ):
+        _save_catalogue(catalogue)
+
+
+def _save_catalogue(catalogue):
+    """Rewrite the log with one line per entry; caller holds ``storage_lock``"""
+    with _catalogue_lock:
+        entries = list(catalogue.values())
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(CATALOGUE_FILE), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(_catalogue_line(e) for e in entries)
+        os.replace(tmp_path, CATALOGUE_FILE)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    _load_catalogue()
+
+
+def get_catalogue_video(video_id):
+    """CatalogueEntry of a video (title, thumbnail, ``playlists``), or None"""
+    return _load_catalogue().get(video_id)
+
+
+def get_video_playlists(video_id):
+    """IDs of every listed playlist containing the video"""
+    entry = _load_catalogue().get(video_id)
+    return list(entry.playlists) if entry else []
+
+
+def _add_to_catalogue(catalogue, changed, video, playlist_id, listed):
+    """Record the video's details in ``changed`` and, if ``listed``, that
+    ``playlist_id`` contains it; no-op if nothing changes"""
+    video_id = video["video_id"]
+    entry = changed.get(video_id) or catalogue.get(video_id)
+    playlists = entry.playlists if entry else ()
+    if listed and playlist_id not in playlists:
+        playlists += (playlist_id,)
+    if entry and "title" not in video:
+        # A bare reference: keep the stored details
+        title, thumbnail = entry.title, entry.thumbnail
+    else:
+        title, thumbnail = video.get("title", ""), video.get("thumbnail")
+    new = CatalogueEntry(video_id, title, thumbnail, playlists)
+    if new != entry:
+        changed[video_id] = new
+
+
+def _remove_from_catalogue(catalogue, changed, video_id, playlist_id):
+    """Record in ``changed`` that ``playlist_id`` no longer contains the video
+
+    The entry itself stays (with its title) for when the playlist is listed
+    again.
+    """
+    entry = changed.get(video_id) or catalogue.get(video_id)
+    if not entry or playlist_id not in entry.playlists:
+        return
+    playlists = [p for p in entry.playlists if p != playlist_id]
+    changed[video_id] = CatalogueEntry(video_id, entry.title, entry.thumbnail, playlists)
+
+
+def import_legacy_catalogue():
+    """Merge catalogues written by older versions into the log and delete them
+
+    Only titles and thumbnails are taken over; memberships are rebuilt by
+    re-saving each playlist's videos (see ``build_video_catalogue``).
+    Returns the number of videos imported.
+    """
+    imported = 0
+    with storage_lock():
+        catalogue = _load_catalogue()
+        changed = {}
+
+        def merge(video_id, data):
+            if video_id not in catalogue and video_id not in changed:
+                changed[video_id] = CatalogueEntry(
+                    video_id, data.get("title", ""), data.get("thumbnail")
+                )
+
+        if os.path.exists(LEGACY_CATALOGUE_FILE):
+            with open(LEGACY_CATALOGUE_FILE, "r", encoding="utf-8") as f:
+                for video_id, data in json.load(f).items():
+                    merge(video_id, data)
+                    imported += 1
+        if os.path.isdir(LEGACY_CATALOGUE_DIR):
+            for name in os.listdir(LEGACY_CATALOGUE_DIR):
+                path = os.path.join(LEGACY_CATALOGUE_DIR, name)
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                merge(data.get("video_id", name[: -len(".json")]), data)
+                imported += 1
+
+        _append_catalogue(changed)
+        if os.path.exists(LEGACY_CATALOGUE_FILE):
+            os.remove(LEGACY_CATALOGUE_FILE)
+        if os.path.isdir(LEGACY_CATALOGUE_DIR):
+            shutil.rmtree(LEGACY_CATALOGUE_DIR)
+    return imported
@@ -0,0 +1,263 @@
+"""
+Database-backed scrape queue for distributed workers
+
+Scrapes are queued as ScrapeTask rows. Workers on any machine claim them
+with ``SELECT ... FOR UPDATE SKIP LOCKED``, hold a lease that a heartbeat
+thread keeps extending, and write results into the Playlist / Video models.
+A task whose lease expires (worker died) is picked up again by another
+worker until ``max_attempts`` is reached.
+"""
+
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import Playlist, ScrapeTask, Video
+
+
+DEFAULT_LEASE_SECONDS = 300
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_scrape(query, max_playlists=12):
+    """Queue a scrape for the workers"""
+    return ScrapeTask.objects.create(query=query, max_playlists=max_playlists)
+
+
+def fail_expired_tasks():
+    """Fail running tasks whose lease expired on their last attempt"""
+    return ScrapeTask.objects.filter(
+        status=ScrapeTask.RUNNING,
+        lease_expires_at__lt=timezone.now(),
+        attempts__gte=F("max_attempts"),
+    ).update(status=ScrapeTask.FAILED, error="Lease expired", lease_owner="")
+
+
+def claim_task(worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Lease the oldest available task, or return None
+
+    Pending tasks and running tasks with an expired lease are available.
+    Rows locked by other workers are skipped; the conditional update also
+    keeps this safe on databases without row locks (SQLite).
+    """
+    now = timezone.now()
+    available = Q(status=ScrapeTask.PENDING) | Q(
+        status=ScrapeTask.RUNNING, lease_expires_at__lt=now
+    )
+
+    with transaction.atomic():
+        task = (
+            ScrapeTask.objects.select_for_update(skip_locked=True)
+            .filter(available, attempts__lt=F("max_attempts"))
+            .order_by("created_at")
+            .first()
+        )
+        if task is None:
+            return None
+
+        lease = {
+            "status": ScrapeTask.RUNNING,
+            "lease_owner": worker_id,
+            "lease_expires_at": now + timedelta(seconds=lease_seconds),
+            "heartbeat_at": now,
+            "attempts": task.attempts + 1,
+        }
+        claimed = ScrapeTask.objects.filter(
+            pk=task.pk,
+            status=task.status,
+            lease_owner=task.lease_owner,
+            attempts=task.attempts,
+        ).update(**lease)
+        if not claimed:
+            return None
+
+    for field, value in lease.items():
+        setattr(task, field, value)
+    return task
+
+
+def heartbeat(task, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Extend our lease; False means it was lost to another worker"""
+    now = timezone.now()
+    return bool(
+        ScrapeTask.objects.filter(
+            pk=task.pk, status=ScrapeTask.RUNNING, lease_owner=worker_id
+        ).update(
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            heartbeat_at=now,
+        )
+    )
+
+
+def complete_task(task, worker_id, result):
+    """Mark a task done, if we still hold its lease"""
+    return bool(
+        ScrapeTask.objects.filter(
+            pk=task.pk, status=ScrapeTask.RUNNING, lease_owner=worker_id
+        ).update(
+            status=ScrapeTask.DONE,
+            result=result,
+            error="",
+            lease_owner="",
+            lease_expires_at=None,
+        )
+    )
+
+
+def fail_task(task, worker_id, error):
+    """Release a failed task for retry, or fail it on its last attempt"""
+    status = ScrapeTask.PENDING
+    if task.attempts >= task.max_attempts:
+        status = ScrapeTask.FAILED
+    return bool(
+        ScrapeTask.objects.filter(
+            pk=task.pk, status=ScrapeTask.RUNNING, lease_owner=worker_id
+        ).update(
+            status=status,
+            error=str(error),
+            lease_owner="",
+            lease_expires_at=None,
+        )
+    )
+
+
+def save_playlist_to_db(playlist):
+    """Upsert a scraped playlist and replace its videos
+
+    Partial playlists (``videos`` is None) keep their stored videos. A
+    video listed more than once keeps only its first position.
+    """
+    videos = playlist.get("videos")
+    if videos is not None:
+        unique = {}
+        for video in videos:
+            unique.setdefault(video["video_id"], video)
+        videos = list(unique.values())
+    with transaction.atomic():
+        obj, _ = Playlist.objects.update_or_create(
+            playlist_id=playlist["playlist_id"],
+            defaults={
+                "title": playlist.get("title", "")[:200],
+                "url": playlist["url"],
+                "thumbnail": playlist.get("thumbnail") or None,
+                "partial": bool(playlist.get("partial")),
+            },
+        )
+        if videos is None:
+            obj.video_count = str(obj.videos.count())
+        else:
+            obj.videos.all().delete()
+            Video.objects.bulk_create(
+                Video(
+                    playlist=obj,
+                    video_id=v["video_id"],
+                    title=v.get("title", "")[:300],
+                    url=v["url"],
+                    position=v.get("position", 0),
+                )
+                for v in videos
+            )
+            obj.video_count = str(len(videos))
+        obj.save(update_fields=["video_count"])
+    return obj
+
+
+class _Heartbeat(threading.Thread):
+    """Extends a task's lease every ``lease_seconds / 3`` until stopped"""
+
+    def __init__(self, task, worker_id, lease_seconds):
+        super().__init__(daemon=True)
+        self.task = task
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+        self.lost = False
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.lease_seconds / 3):
+                if not heartbeat(self.task, self.worker_id, self.lease_seconds):
+                    self.lost = True
+                    print(f"Lost lease on task {self.task.pk}")
+                    return
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_task(task, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Scrape a claimed task into the database while heartbeating its lease"""
+    from .scraper import scrape_query
+
+    scraped = 0
+    partial = 0
+    beat = _Heartbeat(task, worker_id, lease_seconds)
+    beat.start()
+    try:
+        # Each playlist is saved as soon as it is scraped
+        for playlist in scrape_query(task.query, task.max_playlists):
+            if beat.lost:
+                return False
+            save_playlist_to_db(playlist)
+            scraped += 1
+            if playlist.get("partial"):
+                partial += 1
+    except Exception as e:
+        fail_task(task, worker_id, e)
+        raise
+    finally:
+        beat.stop()
+
+    if not scraped:
+        return fail_task(task, worker_id, "No playlists found")
+    return complete_task(
+        task,
+        worker_id,
+        {"total_playlists": scraped, "partial_playlists": partial},
+    )
+
+
+def run_worker(
+    worker_id=None,
+    lease_seconds=DEFAULT_LEASE_SECONDS,
+    poll_interval=5.0,
+    max_tasks=None,
+    burst=False,
+):
+    """Claim and run tasks until ``max_tasks`` are done (forever if None)
+
+    With ``burst`` the worker exits as soon as the queue is empty.
+    """
+    worker_id = worker_id or default_worker_id()
+    done = 0
+    print(f"Worker {worker_id} started")
+
+    while max_tasks is None or done < max_tasks:
+        fail_expired_tasks()
+        task = claim_task(worker_id, lease_seconds)
+        if task is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        print(f"Claimed task {task.pk}: {task.query} (attempt {task.attempts})")
+        try:
+            run_task(task, worker_id, lease_seconds)
+        except Exception as e:
+            print(f"Error: task {task.pk}: {e}")
+        done += 1
+
+    return done
@@ -0,0 +1,28 @@
+from django.test import SimpleTestCase
+
+from ..services import storage
+from .utils import TempStorageMixin, make_playlist
+
+
+class ApiPaginationTests(TempStorageMixin, SimpleTestCase):
+    def test_cursor_resumes_after_last_record(self):
+        for playlist_id in ("P0", "P1", "P2"):
+            storage.save_scraped_playlist(make_playlist(playlist_id, []))
+
+        first = self.client.get("/api/playlists/", {"limit": 2}).json()
+        # A playlist added meanwhile doesn't shift the next page
+        storage.upsert_playlist(make_playlist("P3"))
+        second = self.client.get(
+            "/api/playlists/", {"limit": 2, "cursor": first["next_cursor"]}
+        ).json()
+
+        self.assertEqual([p["playlist_id"] for p in first["results"]], ["P0", "P1"])
+        self.assertEqual([p["playlist_id"] for p in second["results"]], ["P2", "P3"])
+
+    def test_cursor_of_replaced_listing_is_rejected(self):
+        storage.save_scraped_playlist(make_playlist("P0", ["a", "b"]))
+        cursor = self.client.get("/api/videos/", {"limit": 1}).json()["next_cursor"]
+        storage.save_playlists([])
+
+        response = self.client.get("/api/videos/", {"cursor": cursor})
+        self.assertEqual(response.status_code, 400)
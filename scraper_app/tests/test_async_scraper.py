@@ -0,0 +1,128 @@
+import asyncio
+import os
+import time
+from unittest import mock
+
+from django.test import Client, SimpleTestCase, override_settings
+
+from ..services import async_scraper
+from ..services.async_scraper import (
+    AsyncRateLimiter,
+    extract_initial_data,
+    parse_playlist_videos,
+    parse_search_results,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class ParseTests(SimpleTestCase):
+    def test_extract_initial_data(self):
+        data = extract_initial_data(read_fixture("search_page.html"))
+        self.assertIn("twoColumnSearchResultsRenderer", data["contents"])
+
+        self.assertEqual(extract_initial_data("<html>no data</html>"), {})
+        broken = "<script>var ytInitialData = {not json};</script>"
+        self.assertEqual(extract_initial_data(broken), {})
+
+    def test_parse_search_results(self):
+        data = extract_initial_data(read_fixture("search_page.html"))
+        playlists = parse_search_results(data, max_playlists=15)
+
+        self.assertEqual(
+            [p["playlist_id"] for p in playlists], ["PLclassic", "PLlockup", "PLuntitled"]
+        )
+        self.assertEqual(playlists[0]["title"], "Deftones Essentials")
+        self.assertEqual(playlists[0]["thumbnail"], "https://i.ytimg.com/vi/aaa/hqdefault.jpg")
+        self.assertEqual(playlists[0]["url"], "https://www.youtube.com/playlist?list=PLclassic")
+        self.assertEqual(playlists[1]["title"], "White Pony Full Album")
+        self.assertEqual(playlists[1]["thumbnail"], "https://i.ytimg.com/vi/bbb/mqdefault.jpg")
+        self.assertEqual(playlists[2]["title"], "Untitled Playlist")
+        self.assertEqual(
+            playlists[2]["thumbnail"], "https://img.youtube.com/vi/PLuntitled/hqdefault.jpg"
+        )
+
+        self.assertEqual(len(parse_search_results(data, max_playlists=1)), 1)
+
+    def test_parse_playlist_videos(self):
+        data = extract_initial_data(read_fixture("playlist_page.html"))
+        videos = parse_playlist_videos(data, max_videos=50)
+
+        self.assertEqual(
+            videos,
+            [
+                {
+                    "position": 1,
+                    "video_id": "vid00000001",
+                    "title": "Change (In the House of Flies)",
+                    "url": "https://www.youtube.com/watch?v=vid00000001",
+                    "thumbnail": "https://i.ytimg.com/vi/vid00000001/hqdefault.jpg?sqp=x",
+                },
+                {
+                    "position": 2,
+                    "video_id": "vid00000002",
+                    "title": "Digital Bath",
+                    "url": "https://www.youtube.com/watch?v=vid00000002",
+                    "thumbnail": "https://img.youtube.com/vi/vid00000002/hqdefault.jpg",
+                },
+            ],
+        )
+        self.assertEqual(len(parse_playlist_videos(data, max_videos=1)), 1)
+
+
+class AsyncRateLimiterTests(SimpleTestCase):
+    def test_concurrent_waits_are_spaced(self):
+        interval = 0.05
+
+        async def run():
+            limiter = AsyncRateLimiter(interval)
+
+            async def wait():
+                await limiter.wait()
+                return time.monotonic()
+
+            return await asyncio.gather(*(wait() for _ in range(4)))
+
+        times = sorted(asyncio.run(run()))
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        for gap in gaps:
+            self.assertGreaterEqual(gap, interval * 0.9)
+
+
+class ScrapeApiAuthTests(SimpleTestCase):
+    def setUp(self):
+        self.client = Client(enforce_csrf_checks=True)
+        summary = {"search_query": "deftones", "total_playlists": 1, "partial_playlists": 0}
+        patcher = mock.patch.object(
+            async_scraper,
+            "search_and_scrape_playlists_async",
+            mock.AsyncMock(return_value=summary),
+        )
+        self.scrape = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(SCRAPE_API_TOKEN="s3cret")
+    def test_token_authenticates_without_csrf(self):
+        response = self.client.post(
+            "/api/scrape/", {"q": "deftones"}, HTTP_AUTHORIZATION="Bearer s3cret"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total_playlists"], 1)
+
+    @override_settings(SCRAPE_API_TOKEN="s3cret")
+    def test_wrong_token_is_rejected(self):
+        for url in ("/api/scrape/", "/api/scrape/stream/"):
+            response = self.client.post(url, {"q": "deftones"}, HTTP_AUTHORIZATION="Bearer nope")
+            self.assertEqual(response.status_code, 401)
+        self.scrape.assert_not_called()
+
+    @override_settings(SCRAPE_API_TOKEN="", DEBUG=False)
+    def test_disabled_without_token_outside_debug(self):
+        response = self.client.post("/api/scrape/", {"q": "deftones"})
+        self.assertEqual(response.status_code, 403)
+        self.scrape.assert_not_called()
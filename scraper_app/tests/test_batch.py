@@ -0,0 +1,42 @@
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from ..services import batch
+from .utils import make_playlist
+
+
+@mock.patch.object(batch.time, "sleep")
+class BatchScrapeTests(SimpleTestCase):
+    def test_failures_are_recorded_and_batch_continues(self, sleep):
+        def scrape_playlists(query, max_playlists, session=None):
+            if query == "bad":
+                raise RuntimeError("search failed")
+            return [make_playlist(f"{query}{i}") for i in range(2)] + [make_playlist("shared")]
+
+        def persist(playlist):
+            if playlist["playlist_id"] == "a1":
+                raise ValueError("constraint failed")
+
+        with mock.patch.multiple(
+            batch,
+            scrape_playlists=scrape_playlists,
+            scrape_playlist=lambda playlist, index, session=None: dict(playlist, videos=[]),
+        ):
+            report = batch.BatchScrape(persist=persist).run(["a", "bad", "c"])
+
+        stats = {q["query"]: q for q in report["queries"]}
+        self.assertEqual(stats["a"]["failed"], 1)
+        self.assertEqual(stats["a"]["error"], "a1: constraint failed")
+        self.assertEqual(stats["bad"]["error"], "search failed")
+        self.assertEqual(stats["c"]["scraped"], 2)
+        self.assertEqual(stats["c"]["duplicates"], 1)
+        self.assertEqual(report["totals"]["failed_queries"], 2)
+
+
+class ScrapeBatchCommandTests(SimpleTestCase):
+    def test_browsers_must_be_positive(self):
+        for browsers in ("0", "-1"):
+            with self.assertRaisesMessage(CommandError, "--browsers must be at least 1"):
+                call_command("scrape_batch", __file__, "--browsers", browsers)
@@ -0,0 +1,121 @@
+import json
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..services import storage
+from .utils import TempStorageMixin, make_playlist, make_video
+
+
+class CatalogueTests(TempStorageMixin, SimpleTestCase):
+    def test_add_and_remove_memberships(self):
+        storage.save_scraped_playlist(make_playlist("P0", ["a", "b"]))
+        storage.save_scraped_playlist(make_playlist("P1", ["b"]))
+        self.assertEqual(storage.get_video_playlists("b"), ["P0", "P1"])
+
+        storage.save_scraped_playlist(make_playlist("P0", ["a"]))
+        self.assertEqual(storage.get_video_playlists("b"), ["P1"])
+        self.assertEqual(
+            [v["video_id"] for v in storage.get_playlist_videos("P0")], ["a"]
+        )
+
+        storage.save_playlist_videos("P1", [])
+        self.assertEqual(storage.get_video_playlists("b"), [])
+        self.assertEqual(storage.get_catalogue_video("b").title, "Video b")
+
+    def test_delisting_prunes_memberships(self):
+        storage.save_scraped_playlist(make_playlist("P0", ["a"]))
+        storage.save_playlists([])
+
+        self.assertEqual(storage.get_video_playlists("a"), [])
+        self.assertEqual(storage.get_video_by_id("a"), (None, None))
+
+    def test_relisting_restores_memberships(self):
+        storage.save_scraped_playlist(make_playlist("P0", ["a"]))
+        storage.save_scraped_playlist(make_playlist("P1", ["a"]))
+        listing = storage.get_playlists()
+        storage.save_playlists([])
+
+        # As when a checkpointed scrape resumes after another search
+        storage.save_playlists(listing)
+        self.assertEqual(storage.get_video_playlists("a"), ["P0", "P1"])
+        video, playlist = storage.get_video_by_id("a")
+        self.assertEqual(video["title"], "Video a")
+        self.assertEqual(playlist["playlist_id"], "P0")
+
+    def test_unlisted_playlist_keeps_titles_only(self):
+        storage.save_scraped_videos(make_playlist("P0", ["a"]))
+
+        self.assertEqual(storage.get_video_playlists("a"), [])
+        self.assertEqual(storage.get_playlist_videos("P0")[0]["title"], "Video a")
+
+    def test_video_listing_matches_batch_lookup(self):
+        storage.save_scraped_playlist(make_playlist("P0", ["a", "b"]))
+        storage.save_scraped_playlist(make_playlist("P1", ["b"]))
+
+        listed = list(storage.iter_videos())
+        self.assertEqual(listed[1], storage.get_videos_by_ids(["b"])["b"])
+        self.assertEqual(listed[1]["playlist_ids"], ["P0", "P1"])
+
+
+class CatalogueLogTests(TempStorageMixin, SimpleTestCase):
+    def lines(self):
+        with open(storage.CATALOGUE_FILE, "r", encoding="utf-8") as f:
+            return f.readlines()
+
+    def test_saves_append_only_changed_entries(self):
+        storage.save_playlists([make_playlist("P0"), make_playlist("P1")])
+        storage.save_playlist_videos("P0", [make_video("a"), make_video("b", 2)])
+        self.assertEqual(len(self.lines()), 2)
+
+        storage.save_playlist_videos("P1", [make_video("b"), make_video("c", 2)])
+        self.assertEqual(len(self.lines()), 4)
+        # Re-saving the same videos changes nothing
+        storage.save_playlist_videos("P1", [make_video("b"), make_video("c", 2)])
+        self.assertEqual(len(self.lines()), 4)
+
+    def test_reads_parse_only_appended_lines(self):
+        storage.save_scraped_playlist(make_playlist("P0", ["a"]))
+        entry = storage.get_catalogue_video("a")
+
+        with open(storage.CATALOGUE_FILE, "a", encoding="utf-8") as f:
+            # Another process appending: a complete line and a torn one
+            f.write(json.dumps({"video_id": "x", "title": "X", "playlists": []}) + "\n")
+            f.write('{"video_id": "y", "ti')
+
+        self.assertIs(storage.get_catalogue_video("a"), entry)
+        self.assertEqual(storage.get_catalogue_video("x").title, "X")
+        self.assertIsNone(storage.get_catalogue_video("y"))
+
+        # The next writer drops the torn line
+        storage.save_scraped_playlist(make_playlist("P1", ["b"]))
+        self.assertTrue(all(json.loads(line) for line in self.lines()))
+        self.assertEqual(storage.get_video_playlists("b"), ["P1"])
+
+    @mock.patch.object(storage, "CATALOGUE_COMPACT_MIN_LINES", 4)
+    def test_log_is_compacted(self):
+        storage.save_playlists([make_playlist("P0")])
+        storage.save_playlist_videos("P0", [make_video("a"), make_video("b", 2)])
+        for _ in range(2):
+            storage.save_playlists([])
+            storage.save_playlists([make_playlist("P0")])
+
+        self.assertEqual(len(self.lines()), 2)
+        self.assertEqual(storage.get_video_playlists("a"), ["P0"])
+        self.assertEqual(storage.get_catalogue_video("b").title, "Video b")
+
+    def test_import_legacy_catalogues(self):
+        storage.save_scraped_playlist(make_playlist("P0", ["a"]))
+        with open(storage.LEGACY_CATALOGUE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"a": {"title": "Old a"}, "b": {"title": "Old b"}}, f)
+        os.makedirs(storage.LEGACY_CATALOGUE_DIR)
+        with open(os.path.join(storage.LEGACY_CATALOGUE_DIR, "c.json"), "w") as f:
+            json.dump({"video_id": "c", "title": "Old c", "playlists": ["P9"]}, f)
+
+        self.assertEqual(storage.import_legacy_catalogue(), 3)
+        self.assertEqual(storage.get_catalogue_video("a").title, "Video a")
+        self.assertEqual(storage.get_catalogue_video("b").title, "Old b")
+        self.assertEqual(storage.get_video_playlists("c"), [])
+        self.assertFalse(os.path.exists(storage.LEGACY_CATALOGUE_FILE))
+        self.assertFalse(os.path.exists(storage.LEGACY_CATALOGUE_DIR))
@@ -0,0 +1,78 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from ..services import scraper
+from ..services.resilience import DriverError
+
+
+class LazyImportTests(SimpleTestCase):
+    def test_web_modules_dont_load_the_scraping_stack(self):
+        code = (
+            "import sys, django; django.setup(); "
+            "import scraper_app.urls, scraper_app.views; "
+            "print(','.join(m for m in ('selenium', 'bs4', 'webdriver_manager', 'httpx') "
+            "if m in sys.modules))"
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="deftones_search.test_settings")
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        self.assertEqual(output, "")
+
+
+class ChromedriverCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.cache_file = os.path.join(tmp, ".chromedriver_path")
+        self.old_driver = os.path.join(tmp, "chromedriver-old")
+        open(self.old_driver, "w").close()
+
+        patchers = [
+            mock.patch.object(scraper, "CHROMEDRIVER_CACHE_FILE", self.cache_file),
+            mock.patch.dict(os.environ),
+            mock.patch.object(scraper.shutil, "which", return_value="/usr/bin/chromedriver"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        os.environ.pop("CHROMEDRIVER_PATH", None)
+        scraper.resolve_chromedriver.cache_clear()
+        self.addCleanup(scraper.resolve_chromedriver.cache_clear)
+
+    def test_stale_cached_driver_is_dropped_and_retried(self):
+        with open(self.cache_file, "w") as f:
+            f.write(self.old_driver)
+        self.assertEqual(scraper.resolve_chromedriver(), self.old_driver)
+        driver = mock.Mock()
+
+        with mock.patch.object(
+            scraper, "get_driver", side_effect=[OSError("SessionNotCreatedException"), driver]
+        ) as get_driver:
+            with scraper.DriverSession() as session:
+                session.start()
+                self.assertIs(session._driver, driver)
+
+        self.assertEqual(get_driver.call_count, 2)
+        self.assertFalse(os.path.exists(self.cache_file))
+        self.assertEqual(scraper.resolve_chromedriver(), "/usr/bin/chromedriver")
+
+    def test_failure_without_cached_driver_is_not_retried(self):
+        with mock.patch.object(
+            scraper, "get_driver", side_effect=OSError("no chrome")
+        ) as get_driver:
+            with self.assertRaises(DriverError):
+                scraper.DriverSession().start()
+        get_driver.assert_called_once()
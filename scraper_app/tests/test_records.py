@@ -0,0 +1,29 @@
+from django.test import SimpleTestCase
+
+from ..services.records import CatalogueEntry
+
+
+class CatalogueEntryTests(SimpleTestCase):
+    def test_round_trip(self):
+        entry = CatalogueEntry("a", "Title", "https://i.ytimg.com/vi/a/mq.jpg", ["P0", "P1"])
+
+        data = entry.to_dict()
+        self.assertEqual(
+            data,
+            {
+                "title": "Title",
+                "thumbnail": "https://i.ytimg.com/vi/a/mq.jpg",
+                "playlists": ["P0", "P1"],
+            },
+        )
+        self.assertEqual(CatalogueEntry.from_dict("a", data), entry)
+        self.assertNotEqual(CatalogueEntry.from_dict("b", data), entry)
+
+    def test_default_thumbnail_is_derived(self):
+        default = "https://img.youtube.com/vi/a/hqdefault.jpg"
+        entry = CatalogueEntry("a", "Title", default)
+
+        self.assertEqual(entry.thumbnail, default)
+        self.assertIsNone(entry.to_dict()["thumbnail"])
+        self.assertEqual(CatalogueEntry.from_dict("a", {}).thumbnail, default)
+        self.assertEqual(CatalogueEntry.from_dict("a", {}).playlists, ())
@@ -0,0 +1,139 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..services import resilience, scraper
+from ..services.resilience import (
+    BlockedError,
+    CircuitBreaker,
+    CircuitOpenError,
+    DriverError,
+    PermanentScrapeError,
+    TransientScrapeError,
+    call_with_retry,
+    classify_error,
+    get_breaker,
+)
+
+
+class ClassifyErrorTests(SimpleTestCase):
+    def test_status_codes(self):
+        def http_error(status):
+            error = Exception("HTTP error")
+            error.response = mock.Mock(status_code=status)
+            return error
+
+        self.assertIsInstance(classify_error(http_error(429)), BlockedError)
+        self.assertIsInstance(classify_error(http_error(503)), TransientScrapeError)
+        self.assertIsInstance(classify_error(http_error(404)), PermanentScrapeError)
+
+    def test_exception_types(self):
+        self.assertIsInstance(classify_error(TimeoutError()), TransientScrapeError)
+        self.assertIsInstance(classify_error(ValueError("bad")), PermanentScrapeError)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_after_threshold_then_allows_one_trial(self):
+        breaker = CircuitBreaker("example.com", failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.opened_at -= 61
+        breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        self.assertFalse(breaker.is_open)
+
+
+@mock.patch.object(resilience.time, "sleep")
+class CallWithRetryTests(SimpleTestCase):
+    def setUp(self):
+        # Fresh breakers for every test
+        patcher = mock.patch.dict(resilience._breakers, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = get_breaker()
+
+    def open_circuit(self, seconds_ago=0):
+        self.breaker.failures = self.breaker.failure_threshold
+        self.breaker.opened_at = time.monotonic() - seconds_ago
+
+    def test_retries_transient_errors(self, sleep):
+        func = mock.Mock(side_effect=[TimeoutError(), TimeoutError(), "ok"])
+
+        self.assertEqual(call_with_retry(func), "ok")
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_permanent_errors_are_not_retried(self, sleep):
+        func = mock.Mock(side_effect=ValueError("bad page"))
+
+        with self.assertRaises(PermanentScrapeError):
+            call_with_retry(func)
+        self.assertEqual(func.call_count, 1)
+
+    def test_permanent_errors_leave_failure_count(self, sleep):
+        with self.assertRaises(TransientScrapeError):
+            call_with_retry(mock.Mock(side_effect=TimeoutError()), attempts=4)
+        with self.assertRaises(PermanentScrapeError):
+            call_with_retry(mock.Mock(side_effect=ValueError("404")))
+        self.assertEqual(self.breaker.failures, 4)
+
+        with self.assertRaises(TransientScrapeError):
+            call_with_retry(mock.Mock(side_effect=TimeoutError()), attempts=1)
+        self.assertTrue(self.breaker.is_open)
+
+    def test_permanent_error_keeps_half_open_circuit_open(self, sleep):
+        self.open_circuit(seconds_ago=self.breaker.reset_timeout + 1)
+
+        with self.assertRaises(PermanentScrapeError):
+            call_with_retry(mock.Mock(side_effect=ValueError("404")))
+        self.assertTrue(self.breaker.is_open)
+        # The trial slot is free again
+        self.assertEqual(call_with_retry(mock.Mock(return_value="ok")), "ok")
+        self.assertFalse(self.breaker.is_open)
+
+    def test_open_circuit_fails_fast(self, sleep):
+        func = mock.Mock(side_effect=TimeoutError())
+        with self.assertRaises(TransientScrapeError):
+            call_with_retry(func, attempts=5)
+        self.assertTrue(self.breaker.is_open)
+
+        func.reset_mock()
+        with self.assertRaises(CircuitOpenError):
+            call_with_retry(func)
+        func.assert_not_called()
+
+    def test_browser_not_started_while_circuit_open(self, sleep):
+        self.open_circuit()
+
+        with mock.patch.object(scraper, "get_driver") as get_driver:
+            with self.assertRaises(CircuitOpenError):
+                scraper.fetch_playlist_page("https://www.youtube.com/playlist?list=P0")
+        get_driver.assert_not_called()
+
+    def test_browser_startup_failure_skips_breaker(self, sleep):
+        startup = mock.patch.object(
+            scraper, "get_driver", side_effect=OSError("chromedriver missing")
+        )
+        with startup, self.assertRaises(DriverError):
+            scraper.fetch_search_page("deftones")
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_browser_startup_failure_releases_half_open_trial(self, sleep):
+        self.open_circuit(seconds_ago=self.breaker.reset_timeout + 1)
+
+        startup = mock.patch.object(
+            scraper, "get_driver", side_effect=OSError("chromedriver missing")
+        )
+        with startup, self.assertRaises(DriverError):
+            scraper.fetch_search_page("deftones")
+        self.assertTrue(self.breaker.is_open)
+        self.assertEqual(self.breaker.failures, self.breaker.failure_threshold)
+        self.assertEqual(call_with_retry(mock.Mock(return_value="ok")), "ok")
@@ -0,0 +1,85 @@
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..services import async_scraper, scraper, storage
+from .utils import TempStorageMixin, make_playlist, make_video
+
+
+class Crash(Exception):
+    pass
+
+
+@mock.patch.object(scraper.time, "sleep")
+class CheckpointTests(TempStorageMixin, SimpleTestCase):
+    searches = {"A": ["P0", "P1", "P2"], "B": ["P9"]}
+
+    def run_search(self, query, crash_on=None):
+        def scrape_playlists(query, max_playlists=12, session=None):
+            return [make_playlist(p) for p in self.searches[query]]
+
+        def scrape_playlist_videos(playlist_id, url, max_videos=50, session=None):
+            if playlist_id == crash_on:
+                raise Crash()
+            return [make_video(f"v{playlist_id}")]
+
+        with mock.patch.multiple(
+            scraper,
+            scrape_playlists=scrape_playlists,
+            scrape_playlist_videos=scrape_playlist_videos,
+        ):
+            return scraper.search_and_scrape_playlists(query)
+
+    def listed(self):
+        return [p["playlist_id"] for p in storage.get_playlists()]
+
+    def test_resume_after_crash(self, sleep):
+        with self.assertRaises(Crash):
+            self.run_search("A", crash_on="P1")
+        self.assertEqual(self.listed(), ["P0"])
+
+        result = self.run_search("A")
+        self.assertEqual(self.listed(), ["P0", "P1", "P2"])
+        self.assertEqual(result["total_playlists"], 3)
+        self.assertIsNone(storage.get_checkpoint("A"))
+
+    def test_resume_after_other_search(self, sleep):
+        with self.assertRaises(Crash):
+            self.run_search("A", crash_on="P1")
+        self.assertEqual(self.run_search("B")["total_playlists"], 1)
+
+        result = self.run_search("A")
+        self.assertEqual(self.listed(), ["P0", "P1", "P2"])
+        self.assertEqual(result["total_playlists"], 3)
+
+    def test_stale_checkpoint_is_discarded(self, sleep):
+        storage.save_checkpoint("A", [make_playlist("P0")], [])
+
+        self.assertIsNotNone(storage.get_checkpoint("A"))
+        self.assertIsNone(storage.get_checkpoint("A", max_age=-1))
+        self.assertIsNone(storage.get_checkpoint("A"))
+
+
+class AsyncScrapeOrderTests(TempStorageMixin, SimpleTestCase):
+    def test_listing_keeps_search_order(self):
+        delays = {"P0": 0.03, "P1": 0.02, "P2": 0.0}
+
+        class Engine(async_scraper.AsyncScrapeEngine):
+            async def scrape_playlists(self, query, max_playlists=15):
+                return [make_playlist(p) for p in delays]
+
+            async def scrape_playlist_videos(self, playlist_id, max_videos=50):
+                await asyncio.sleep(delays[playlist_id])
+                return [make_video(f"v{playlist_id}")]
+
+        async def run():
+            async with Engine() as engine:
+                return await engine.search_and_scrape_playlists("A")
+
+        result = asyncio.run(run())
+        self.assertEqual(result["total_playlists"], 3)
+        self.assertEqual(
+            [p["playlist_id"] for p in storage.get_playlists()], ["P0", "P1", "P2"]
+        )
+
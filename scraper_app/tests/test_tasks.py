@@ -0,0 +1,144 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import ScrapeTask, Video
+from ..services import tasks
+from .utils import make_playlist
+
+
+class ScrapeTaskQueueTests(TestCase):
+    def test_claim_is_exclusive(self):
+        task = tasks.enqueue_scrape("deftones")
+
+        claimed = tasks.claim_task("w1")
+        self.assertEqual(claimed.pk, task.pk)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(tasks.claim_task("w2"))
+
+    def test_expired_lease_is_reclaimed(self):
+        tasks.enqueue_scrape("deftones")
+        first = tasks.claim_task("w1")
+        ScrapeTask.objects.filter(pk=first.pk).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        second = tasks.claim_task("w2")
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(second.lease_owner, "w2")
+        self.assertEqual(second.attempts, 2)
+
+    def test_heartbeat_after_lease_lost(self):
+        tasks.enqueue_scrape("deftones")
+        task = tasks.claim_task("w1")
+        self.assertTrue(tasks.heartbeat(task, "w1"))
+
+        ScrapeTask.objects.filter(pk=task.pk).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        tasks.claim_task("w2")
+        self.assertFalse(tasks.heartbeat(task, "w1"))
+        self.assertFalse(tasks.complete_task(task, "w1", {}))
+        self.assertEqual(ScrapeTask.objects.get(pk=task.pk).lease_owner, "w2")
+
+    def test_fail_task_retries_until_max_attempts(self):
+        task = tasks.enqueue_scrape("deftones")
+        ScrapeTask.objects.filter(pk=task.pk).update(max_attempts=2)
+
+        self.assertTrue(tasks.fail_task(tasks.claim_task("w1"), "w1", "boom"))
+        self.assertEqual(ScrapeTask.objects.get(pk=task.pk).status, ScrapeTask.PENDING)
+
+        self.assertTrue(tasks.fail_task(tasks.claim_task("w1"), "w1", "boom"))
+        task.refresh_from_db()
+        self.assertEqual(task.status, ScrapeTask.FAILED)
+        self.assertEqual(task.error, "boom")
+        self.assertIsNone(tasks.claim_task("w1"))
+
+    def test_expired_last_attempt_is_failed(self):
+        task = tasks.enqueue_scrape("deftones")
+        ScrapeTask.objects.filter(pk=task.pk).update(max_attempts=1)
+        tasks.claim_task("w1")
+        ScrapeTask.objects.filter(pk=task.pk).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(tasks.fail_expired_tasks(), 1)
+        self.assertEqual(ScrapeTask.objects.get(pk=task.pk).status, ScrapeTask.FAILED)
+
+
+class SavePlaylistToDbTests(TestCase):
+    def test_partial_playlist_keeps_stored_videos(self):
+        tasks.save_playlist_to_db(make_playlist("P0", ["a", "b"]))
+
+        partial = dict(make_playlist("P0"), partial=True, error="timeout", videos=None)
+        obj = tasks.save_playlist_to_db(partial)
+
+        self.assertTrue(obj.partial)
+        self.assertEqual(obj.video_count, "2")
+        self.assertEqual(list(obj.videos.values_list("video_id", flat=True)), ["a", "b"])
+
+    def test_repeated_videos_keep_first_position(self):
+        obj = tasks.save_playlist_to_db(make_playlist("P0", ["a", "b", "a"]))
+
+        self.assertEqual(
+            list(obj.videos.values_list("video_id", "position")), [("a", 1), ("b", 2)]
+        )
+        self.assertEqual(obj.video_count, "2")
+
+    def test_cleanup_duplicates_keeps_videos_shared_between_playlists(self):
+        tasks.save_playlist_to_db(make_playlist("P0", ["a", "shared"]))
+        tasks.save_playlist_to_db(make_playlist("P1", ["shared"]))
+
+        call_command("cleanup_duplicates", stdout=StringIO())
+
+        self.assertEqual(Video.objects.filter(video_id="shared").count(), 2)
+
+
+@override_settings(SCRAPE_USE_WORKERS=True, SCRAPE_API_TOKEN="s3cret")
+class DbStorageApiTests(TestCase):
+    def setUp(self):
+        for playlist_id in ("P0", "P1", "P2"):
+            tasks.save_playlist_to_db(make_playlist(playlist_id, [f"a{playlist_id}", "shared"]))
+
+    def test_pages_read_the_database(self):
+        self.assertContains(self.client.get("/"), "Playlist P1")
+        self.assertContains(self.client.get("/playlist/P1/"), "Video aP1")
+        self.assertEqual(self.client.get("/video/shared/").status_code, 200)
+
+    def test_keyset_pagination(self):
+        videos = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            data = self.client.get("/api/videos/", params).json()
+            videos += data["results"]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        # Newest playlist first
+        self.assertEqual(
+            [(v["playlist_id"], v["video_id"]) for v in videos],
+            [("P2", "aP2"), ("P2", "shared"), ("P1", "aP1"), ("P1", "shared"),
+             ("P0", "aP0"), ("P0", "shared")],
+        )
+        self.assertEqual(videos[1]["playlist_ids"], ["P2", "P1", "P0"])
+
+        lookup = self.client.get("/api/videos/", {"ids": "shared"}).json()
+        self.assertEqual(lookup["results"][0], videos[1])
+
+
+@override_settings(SCRAPE_USE_WORKERS=True, SCRAPE_API_TOKEN="s3cret")
+class WorkerModeScrapeApiTests(TestCase):
+    def test_scrape_apis_queue_tasks(self):
+        for url in ("/api/scrape/", "/api/scrape/stream/"):
+            response = self.client.post(
+                url, {"q": "deftones"}, HTTP_AUTHORIZATION="Bearer s3cret"
+            )
+            self.assertEqual(response.status_code, 202)
+            task = ScrapeTask.objects.get(pk=response.json()["task_id"])
+            self.assertEqual(task.query, "deftones")
+        self.assertEqual(ScrapeTask.objects.count(), 2)
@@ -0,0 +1,54 @@
+"""
+Shared helpers for the scraper_app tests
+"""
+
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from ..services import storage
+
+
+def make_playlist(playlist_id, videos=None):
+    playlist = {
+        "playlist_id": playlist_id,
+        "url": f"https://www.youtube.com/playlist?list={playlist_id}",
+        "title": f"Playlist {playlist_id}",
+        "thumbnail": None,
+        "video_count": 0,
+    }
+    if videos is not None:
+        playlist["videos"] = [make_video(v, i + 1) for i, v in enumerate(videos)]
+    return playlist
+
+
+def make_video(video_id, position=1):
+    return {
+        "position": position,
+        "video_id": video_id,
+        "title": f"Video {video_id}",
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "thumbnail": None,
+    }
+
+
+class TempStorageMixin:
+    """Point the JSON storage at a temporary directory"""
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        patcher = mock.patch.multiple(
+            storage,
+            PLAYLISTS_FILE=os.path.join(tmp, "playlists.json"),
+            VIDEOS_DIR=os.path.join(tmp, "videos"),
+            CATALOGUE_FILE=os.path.join(tmp, "video_catalogue.ndjson"),
+            LEGACY_CATALOGUE_FILE=os.path.join(tmp, "video_catalogue.json"),
+            LEGACY_CATALOGUE_DIR=os.path.join(tmp, "videos", "catalogue"),
+            CHECKPOINTS_DIR=os.path.join(tmp, "checkpoints"),
+            LOCK_FILE=os.path.join(tmp, "storage.lock"),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
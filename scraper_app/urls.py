@@ -6,4 +6,8 @@ urlpatterns = [
     path("scrape/", views.scrape_playlists, name="scrape"),
     path("playlist/<str:playlist_id>/", views.playlist_detail, name="playlist_detail"),
     path("video/<str:video_id>/", views.video_player, name="video_player"),
+    path("api/playlists/", views.api_playlists, name="api_playlists"),
+    path("api/videos/", views.api_videos, name="api_videos"),
+    path("api/scrape/", views.api_scrape, name="api_scrape"),
+    path("api/scrape/stream/", views.api_scrape_stream, name="api_scrape_stream"),
 ]
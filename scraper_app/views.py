@@ -1,19 +1,66 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, redirect
-from django.http import JsonResponse, HttpResponseRedirect
+from django.http import JsonResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib import messages
+import base64
+import binascii
+import hmac
 import json
-from .services.scraper import (
-    search_and_scrape_playlists,
-    get_playlists,
-    get_playlist_by_id,
-    get_video_by_id,
-)
+from functools import wraps
+from .services import storage
 
 
 RECENT_SEARCHES_COOKIE = "recent_searches"
 MAX_RECENT_SEARCHES = 5
 
+API_DEFAULT_LIMIT = 50
+API_MAX_LIMIT = 500
+API_MAX_BATCH_IDS = 500
+
+
+def get_storage():
+    """Where scraped playlists are read from
+
+    Scrape workers write into the database, so with SCRAPE_USE_WORKERS the
+    pages and API read it too; otherwise the JSON files.
+    """
+    if settings.SCRAPE_USE_WORKERS:
+        from .services import db_storage
+
+        return db_storage
+    return storage
+
+
+def _check_scrape_token(request):
+    """None if the request may start a scrape, else the error response
+
+    The scrape APIs are for non-browser clients, so they skip CSRF and
+    authenticate with ``Authorization: Bearer <SCRAPE_API_TOKEN>``.
+    Without a token configured they are only open in DEBUG.
+    """
+    token = settings.SCRAPE_API_TOKEN
+    if not token:
+        if settings.DEBUG:
+            return None
+        return JsonResponse(
+            {"error": "Scrape API disabled: SCRAPE_API_TOKEN is not set"}, status=403
+        )
+    given = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(given.encode(), f"Bearer {token}".encode()):
+        return JsonResponse({"error": "Invalid or missing API token"}, status=401)
+    return None
+
+
+def _queue_scrape(query):
+    """Queue a scrape for the workers; the 202 response of the scrape APIs"""
+    from .services.tasks import enqueue_scrape
+
+    task = enqueue_scrape(query, max_playlists=12)
+    return JsonResponse({"task_id": task.pk, "status": task.status}, status=202)
+
 
 def get_recent_searches(request):
     """Get recent searches from cookie"""
@@ -46,7 +93,7 @@ def save_recent_search(request, response, query):
 
 def home(request):
     """Home page - show all playlists from JSON"""
-    playlists = get_playlists()
+    playlists = get_storage().get_playlists()
     recent_searches = get_recent_searches(request)
     context = {"playlists": playlists, "recent_searches": recent_searches}
     return render(request, "scraper_app/home.html", context)
@@ -61,10 +108,26 @@ def scrape_playlists(request):
         messages.error(request, "Please enter a search query")
         return redirect("home")
 
+    if settings.SCRAPE_USE_WORKERS:
+        from .services.tasks import enqueue_scrape
+
+        enqueue_scrape(query, max_playlists=12)
+        messages.info(request, f"Scrape for '{query}' queued")
+        response = redirect("home")
+        return save_recent_search(request, response, query)
+
+    # Imported here so read-only workers never load Selenium
+    from .services.scraper import search_and_scrape_playlists
+
     result = search_and_scrape_playlists(query, max_playlists=12)
 
     if result:
         messages.success(request, f"Found {result['total_playlists']} playlists!")
+        if result["partial_playlists"]:
+            messages.warning(
+                request,
+                f"{result['partial_playlists']} playlists could not be fully scraped",
+            )
 
         # Save to recent searches
         response = redirect("home")
@@ -76,7 +139,7 @@ def scrape_playlists(request):
 
 def playlist_detail(request, playlist_id):
     """Display playlist details with videos from JSON"""
-    playlist = get_playlist_by_id(playlist_id)
+    playlist = get_storage().get_playlist_by_id(playlist_id)
 
     if not playlist:
         from django.http import Http404
@@ -89,7 +152,7 @@ def playlist_detail(request, playlist_id):
 
 def video_player(request, video_id):
     """Video player page"""
-    video, playlist = get_video_by_id(video_id)
+    video, playlist = get_storage().get_video_by_id(video_id)
 
     if not video:
         from django.http import Http404
@@ -108,3 +171,220 @@ def video_player(request, video_id):
         "related_videos": related_videos,
     }
     return render(request, "scraper_app/video_player.html", context)
+
+
+# JSON API
+class ApiError(Exception):
+    """Bad API request, rendered as a 400 JSON response"""
+
+
+def _get_list_param(request, name):
+    """Read a list param given as ?name=a,b or ?name=a&name=b"""
+    values = []
+    for raw in request.GET.getlist(name):
+        values.extend(v.strip() for v in raw.split(",") if v.strip())
+    return list(dict.fromkeys(values))
+
+
+def _get_limit(request):
+    """Page size, clamped to API_MAX_LIMIT"""
+    try:
+        limit = int(request.GET.get("limit", API_DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError("limit must be an integer")
+    if limit < 1:
+        raise ApiError("limit must be positive")
+    return min(limit, API_MAX_LIMIT)
+
+
+def _encode_cursor(key):
+    """Opaque cursor for the key of the last record of a page"""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor):
+    """Key a page should start after, or None for the first page"""
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ApiError("Invalid cursor")
+    if not isinstance(key, list) or not key:
+        raise ApiError("Invalid cursor")
+    return key
+
+
+def _select_fields(record, fields):
+    """Project a record down to the requested fields"""
+    if not fields:
+        return record
+    return {f: record[f] for f in fields if f in record}
+
+
+def _ndjson_response(records, fields):
+    """Stream records as newline-delimited JSON for bulk export"""
+    lines = (
+        json.dumps(_select_fields(r, fields), ensure_ascii=False) + "\n"
+        for r in records
+    )
+    return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+
+def _api_response(request, ids, lookup, listing, cursor_key):
+    """Shared batch / paginated / NDJSON handling for the list endpoints
+
+    Pagination is keyset based: ``listing(after)`` iterates the records
+    after the decoded cursor key (None for the first page), and
+    ``cursor_key(record)`` is the key of a page's last record.
+    """
+    fields = _get_list_param(request, "fields")
+    ndjson = request.GET.get("format") == "ndjson"
+
+    if ids:
+        if len(ids) > API_MAX_BATCH_IDS:
+            raise ApiError(f"At most {API_MAX_BATCH_IDS} ids per request")
+        found = lookup(ids)
+        results = [found[i] for i in ids if i in found]
+        if ndjson:
+            return _ndjson_response(results, fields)
+        return JsonResponse(
+            {
+                "results": [_select_fields(r, fields) for r in results],
+                "missing": [i for i in ids if i not in found],
+            }
+        )
+
+    after = _decode_cursor(request.GET.get("cursor"))
+    try:
+        records = listing(after)
+    except (KeyError, TypeError, ValueError):
+        raise ApiError("Invalid or expired cursor; start again without it")
+    if ndjson:
+        return _ndjson_response(records, fields)
+
+    limit = _get_limit(request)
+    page = []
+    last = None
+    has_more = False
+    for record in records:
+        if len(page) == limit:
+            has_more = True
+            break
+        page.append(_select_fields(record, fields))
+        last = record
+
+    return JsonResponse(
+        {
+            "results": page,
+            "next_cursor": _encode_cursor(cursor_key(last)) if has_more else None,
+        }
+    )
+
+
+def _api_view(func):
+    """Render ApiError as a 400 JSON response"""
+
+    @wraps(func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return func(request, *args, **kwargs)
+        except ApiError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+    return wrapper
+
+
+@require_http_methods(["GET"])
+@_api_view
+def api_playlists(request):
+    """List playlists, or batch-lookup them with ?ids=a,b,c"""
+    backend = get_storage()
+    ids = _get_list_param(request, "ids")
+    return _api_response(
+        request,
+        ids,
+        backend.get_playlists_by_ids,
+        lambda after: backend.iter_playlists(*after) if after else backend.iter_playlists(),
+        lambda playlist: [playlist["playlist_id"]],
+    )
+
+
+@require_http_methods(["GET"])
+@_api_view
+def api_videos(request):
+    """List videos, or batch-lookup them with ?ids=a,b,c
+
+    ?playlist_id=... (repeatable) restricts the listing to those playlists.
+    """
+    backend = get_storage()
+    ids = _get_list_param(request, "ids")
+    playlist_ids = set(_get_list_param(request, "playlist_id")) or None
+    return _api_response(
+        request,
+        ids,
+        backend.get_videos_by_ids,
+        lambda after: backend.iter_videos(playlist_ids, after),
+        lambda video: [video["playlist_id"], video["position"]],
+    )
+
+
+async def api_scrape(request):
+    """Scrape playlists with the asyncio engine and return a JSON summary
+
+    With SCRAPE_USE_WORKERS the scrape is queued instead (202 + task ID).
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Method not allowed"}, status=405)
+    denied = _check_scrape_token(request)
+    if denied:
+        return denied
+
+    query = request.POST.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "Please enter a search query"}, status=400)
+
+    if settings.SCRAPE_USE_WORKERS:
+        return await sync_to_async(_queue_scrape)(query)
+
+    from .services.async_scraper import search_and_scrape_playlists_async
+
+    result = await search_and_scrape_playlists_async(query, max_playlists=12)
+    if not result:
+        return JsonResponse({"error": "No playlists found"}, status=404)
+    return JsonResponse(result)
+
+
+# csrf_exempt only wraps async views from Django 5.0 on
+api_scrape.csrf_exempt = True
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_scrape_stream(request):
+    """Scrape playlists, streaming each one as NDJSON as soon as it is saved
+
+    With SCRAPE_USE_WORKERS the scrape is queued instead (202 + task ID).
+    """
+    denied = _check_scrape_token(request)
+    if denied:
+        return denied
+
+    query = request.POST.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "Please enter a search query"}, status=400)
+
+    if settings.SCRAPE_USE_WORKERS:
+        return _queue_scrape(query)
+
+    from .services.resilience import ScrapeError
+    from .services.scraper import stream_scrape_playlists
+
+    def lines():
+        try:
+            for playlist in stream_scrape_playlists(query, max_playlists=12):
+                yield json.dumps(playlist, ensure_ascii=False) + "\n"
+        except ScrapeError as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingHttpResponse(lines(), content_type="application/x-ndjson")